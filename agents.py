@@ -126,7 +126,17 @@
 #     return crew
 from crewai import Agent, Task, Crew, Process, LLM
 from tools import StockAnalysisTools
+from llm_router import ModelRouter
+from sentiment import batch_news_sentiment
+from news_store import NewsStore
+from screening import rank_candidates
+from intraday import IntradayStore, session_snapshot
+from deadline import Deadline, deadline_scope
+from checkpoints import CheckpointStore, make_run_key
+from report_archive import ReportArchive
+from concurrent.futures import ThreadPoolExecutor, wait
 import os
+import re
 
 # --- SHARED LLM CONFIGURATION ---
 def get_gemini_llm(api_key):
@@ -138,8 +148,13 @@ def get_gemini_llm(api_key):
     )
 
 # --- CREW 1: SINGLE STOCK DEEP DIVE (Updated with Date Range) ---
-def create_single_stock_crew(ticker: str, start_date: str, end_date: str, google_api_key: str, alpha_vantage_key: str):
-    llm = get_gemini_llm(google_api_key)
+def create_single_stock_tasks(ticker: str, start_date: str, end_date: str, google_api_key: str, alpha_vantage_key: str, sentiment_mode: str = "alpha_vantage", router: ModelRouter = None, model_log: list = None):
+    # Each role gets its own model / temperature / token cap with latency-aware fallback
+    router = router or ModelRouter(google_api_key)
+
+    # "local" scores Yahoo headlines offline and spends no Alpha Vantage quota
+    use_local_sentiment = sentiment_mode == "local" or not alpha_vantage_key
+    sentiment_tool = StockAnalysisTools.fetch_local_news_sentiment if use_local_sentiment else StockAnalysisTools.fetch_news_sentiment
 
     # 1. Sentiment Analyst
     sentiment_agent = Agent(
@@ -148,8 +163,8 @@ def create_single_stock_crew(ticker: str, start_date: str, end_date: str, google
         backstory="You are an expert in behavioral finance. You analyze news headlines and sentiment scores to understand the market's psychological state.",
         verbose=True,
         allow_delegation=False,
-        tools=[StockAnalysisTools.fetch_news_sentiment], 
-        llm=llm
+        tools=[sentiment_tool], 
+        llm=router.llm_for('Senior Sentiment Analyst', model_log)
     )
 
     # 2. Fundamental Analyst
@@ -160,7 +175,7 @@ def create_single_stock_crew(ticker: str, start_date: str, end_date: str, google
         verbose=True,
         allow_delegation=False,
         tools=[StockAnalysisTools.fetch_fundamental_data],
-        llm=llm
+        llm=router.llm_for('Fundamental Analyst', model_log)
     )
 
     # 3. Technical Analyst
@@ -170,8 +185,8 @@ def create_single_stock_crew(ticker: str, start_date: str, end_date: str, google
         backstory="You are a chartist focused on RSI, MACD, and price action.",
         verbose=True,
         allow_delegation=False,
-        tools=[StockAnalysisTools.calculate_technicals],
-        llm=llm
+        tools=[StockAnalysisTools.calculate_technicals, StockAnalysisTools.fetch_intraday_price_action],
+        llm=router.llm_for('Technical Analyst', model_log)
     )
 
     # 4. Portfolio Manager
@@ -181,16 +196,20 @@ def create_single_stock_crew(ticker: str, start_date: str, end_date: str, google
         backstory="You make the final investment decision based on sentiment, fundamentals, and technicals.",
         verbose=True,
         allow_delegation=False,
-        llm=llm
+        llm=router.llm_for('Portfolio Manager', model_log)
     )
 
     # --- TASKS ---
     
+    if use_local_sentiment:
+        sentiment_instructions = "Use the 'Fetch Local News Sentiment' tool with the ticker as its only argument."
+    else:
+        sentiment_instructions = f"Use the 'Fetch News Sentiment' tool. \n        **IMPORTANT**: Pass the API Key '{alpha_vantage_key}' as the second argument to the tool, with start_date '{start_date}' and end_date '{end_date}'."
+
     task_sentiment = Task(
         description=f"""
         Fetch the news sentiment for {ticker}. 
-        Use the 'Fetch News Sentiment' tool. 
-        **IMPORTANT**: Pass the API Key '{alpha_vantage_key}' as the second argument to the tool.
+        {sentiment_instructions}
         Analyze if the sentiment during {start_date} to {end_date} supports a bullish or bearish thesis.
         """,
         expected_output="A summary of market sentiment (Bullish/Bearish) and key headlines.",
@@ -204,7 +223,7 @@ def create_single_stock_crew(ticker: str, start_date: str, end_date: str, google
     )
     
     task_technicals = Task(
-        description=f"Calculate technical indicators for {ticker}. Focus on trends relevant to the window {start_date} to {end_date}.",
+        description=f"Calculate technical indicators for {ticker}. Focus on trends relevant to the window {start_date} to {end_date}. RSI over 70 is Overbought, under 30 is Oversold. If the window ends today, also check today's intraday price action.",
         expected_output="Technical analysis report.",
         agent=technical_agent
     )
@@ -213,8 +232,12 @@ def create_single_stock_crew(ticker: str, start_date: str, end_date: str, google
         description=f"""
         Generate a Final Investment Report for {ticker} covering {start_date} to {end_date}.
         
+        Start the report with these two lines, formatted exactly like this:
+        **Recommendation:** [STRONG BUY / BUY / HOLD / SELL / STRONG SELL]
+        **Confidence Score:** [0-100]%
+        
         Sections:
-        1. **Executive Summary**: Recommendation (BUY/SELL/HOLD) & Confidence Score.
+        1. **Executive Summary**: One paragraph on why.
         2. **Sentiment Analysis**: What is the news saying?
         3. **Fundamental Health**: Is the company strong?
         4. **Technical Outlook**: What does the chart say?
@@ -224,32 +247,213 @@ def create_single_stock_crew(ticker: str, start_date: str, end_date: str, google
         context=[task_sentiment, task_fundamentals, task_technicals]
     )
 
+    return {
+        "sentiment": task_sentiment,
+        "fundamentals": task_fundamentals,
+        "technicals": task_technicals,
+        "report": task_report,
+    }
+
+def create_single_stock_crew(ticker: str, start_date: str, end_date: str, google_api_key: str, alpha_vantage_key: str, sentiment_mode: str = "alpha_vantage", router: ModelRouter = None):
+    tasks = create_single_stock_tasks(ticker, start_date, end_date, google_api_key, alpha_vantage_key, sentiment_mode, router)
     return Crew(
-        agents=[sentiment_agent, fundamental_agent, technical_agent, manager_agent],
-        tasks=[task_sentiment, task_fundamentals, task_technicals, task_report],
+        agents=[task.agent for task in tasks.values()],
+        tasks=list(tasks.values()),
         process=Process.sequential,
         verbose=True,
         max_rpm=5
     )
 
+# --- DEADLINE-AWARE DEEP DIVE ---
+PROMPT_VERSION = 2          # Bump when agent/task prompts change to invalidate checkpoints
+DEFAULT_RUN_DEADLINE = 60   # Seconds until a report must be on screen
+MANAGER_RESERVE = 15        # Seconds of the deadline kept back for the Portfolio Manager
+RUN_MAX_RPM = 5             # LLM requests per minute for a whole run, split across its concurrent crews
+
+# Analyst task -> report section it feeds
+ANALYST_SECTIONS = {
+    "sentiment": "Sentiment Analysis",
+    "fundamentals": "Fundamental Health",
+    "technicals": "Technical Outlook",
+}
+
+def run_task_with_deadline(task: Task, deadline: Deadline, max_rpm: int = RUN_MAX_RPM) -> str:
+    """Runs one task as its own crew with `deadline` visible to its tools and LLM calls."""
+    with deadline_scope(deadline):
+        crew = Crew(agents=[task.agent], tasks=[task], process=Process.sequential, verbose=True, max_rpm=max_rpm)
+        return str(crew.kickoff())
+
+def build_partial_report(ticker: str, outputs: dict, missing: list) -> str:
+    """Report assembled without the manager, used when it cannot finish in time."""
+    lines = [f"# Investment Report: {ticker} (Partial)", "",
+             "**Recommendation:** N/A (Portfolio Manager did not finish before the deadline)", ""]
+    for name, section in ANALYST_SECTIONS.items():
+        lines.append(f"## {section}")
+        lines.append(outputs[name] if name in outputs else "⚠️ Not available: analyst did not finish before the deadline.")
+        lines.append("")
+    return "\n".join(lines)
+
+def single_stock_run_key(ticker: str, start_date: str, end_date: str, sentiment_mode: str, router: ModelRouter) -> str:
+    return make_run_key(
+        ticker=ticker.upper(),
+        start_date=start_date,
+        end_date=end_date,
+        sentiment_mode=sentiment_mode,
+        models={role: route["model"] for role, route in router.routes.items()},
+        prompt_version=PROMPT_VERSION,
+    )
+
+def run_single_stock_analysis(ticker: str, start_date: str, end_date: str, google_api_key: str, alpha_vantage_key: str,
+                              sentiment_mode: str = "alpha_vantage", router: ModelRouter = None,
+                              deadline_seconds: float = DEFAULT_RUN_DEADLINE,
+                              checkpoints: CheckpointStore = None, regenerate_report: bool = False,
+                              archive: ReportArchive = None, model_log: list = None) -> tuple:
+    """
+    Deep dive bounded by `deadline_seconds`. Analysts run concurrently until the
+    deadline minus MANAGER_RESERVE; unfinished ones are abandoned and the manager
+    reports on whatever completed, marking missing sections.
+
+    Every task output is checkpointed under the run key, so a retry only runs the
+    tasks that have not finished yet. `regenerate_report` re-runs just the manager
+    on the cached analyst outputs. Each new report, complete or partial, is
+    added to the report archive. Returns (report, archive id), the id being
+    None for a report served from the checkpoints. `model_log`, if given,
+    collects which model answered each of this run's LLM calls.
+    """
+    deadline = Deadline(deadline_seconds)
+    router = router or ModelRouter(google_api_key)
+    checkpoints = checkpoints or CheckpointStore()
+    archive = archive or ReportArchive()
+    run_key = single_stock_run_key(ticker, start_date, end_date, sentiment_mode, router)
+
+    cached = checkpoints.load(run_key)
+    if "report" in cached and not regenerate_report:
+        return cached["report"], None
+
+    tasks = create_single_stock_tasks(ticker, start_date, end_date, google_api_key, alpha_vantage_key, sentiment_mode, router,
+                                      model_log)
+    outputs = {name: cached[name] for name in ANALYST_SECTIONS if name in cached}
+
+    def run_analyst(name, analyst_deadline, max_rpm):
+        output = run_task_with_deadline(tasks[name], analyst_deadline, max_rpm)
+        checkpoints.save(run_key, name, output)  # persisted the moment it finishes
+        return output
+
+    pending = [name for name in ANALYST_SECTIONS if name not in outputs]
+    if pending:
+        # Short deadlines still leave most of the time to the analysts
+        analyst_deadline = deadline.child(min(MANAGER_RESERVE, deadline_seconds * 0.4))
+        # Each crew has its own rate limiter, so the run's budget is split between them
+        analyst_rpm = max(1, RUN_MAX_RPM // len(pending))
+        pool = ThreadPoolExecutor(max_workers=len(pending))
+        futures = {pool.submit(run_analyst, name, analyst_deadline, analyst_rpm): name for name in pending}
+        done, _ = wait(futures, timeout=analyst_deadline.remaining())
+        # Stragglers see the expired deadline at their next tool / LLM call and stop there
+        pool.shutdown(wait=False, cancel_futures=True)
+        outputs.update({futures[f]: f.result() for f in done if f.exception() is None})
+
+    missing = [name for name in ANALYST_SECTIONS if name not in outputs]
+
+    report = tasks["report"]
+    analyst_notes = "\n\n".join(
+        f"### {section} input\n" + (outputs[name] if name in outputs else "UNAVAILABLE (analyst timed out)")
+        for name, section in ANALYST_SECTIONS.items()
+    )
+    missing_note = ""
+    if missing:
+        missing_note = ("Some analyst reports are unavailable. In those sections write "
+                        "'⚠️ Not available: analyst did not finish in time' and lower the Confidence Score accordingly.")
+    manager_task = Task(
+        description=f"{report.description}\n        Analyst reports:\n{analyst_notes}\n        {missing_note}",
+        expected_output=report.expected_output,
+        agent=report.agent
+    )
+
+    manager_pool = ThreadPoolExecutor(max_workers=1)
+    future = manager_pool.submit(run_task_with_deadline, manager_task, deadline)
+    manager_pool.shutdown(wait=False)
+    try:
+        result = future.result(timeout=deadline.remaining())
+    except Exception:
+        partial = build_partial_report(ticker, outputs, missing)
+        return partial, archive.add_deep_dive(ticker, start_date, end_date, partial, partial=True)
+
+    # Only a complete report is final; otherwise the next retry fills the gaps
+    if not missing:
+        checkpoints.save(run_key, "report", result)
+    return result, archive.add_deep_dive(ticker, start_date, end_date, result, partial=bool(missing))
+
 # --- CREW 2: MARKET SCANNER ---
-def create_market_scanner_crew(top_stocks: list, google_api_key: str):
-    llm = get_gemini_llm(google_api_key)
+SCANNER_TOP_K = 15        # Candidates that reach the LLM after local pre-filtering
+SCANNER_CHUNK_SIZE = 5    # Tickers per Market Strategist prompt
+SCANNER_MAX_WORKERS = 2   # Concurrent chunk crews (sharing RUN_MAX_RPM between them)
+SCANNER_INTRADAY_BAR = "15m"  # Bar size behind the "today's price action" context
+
+def format_sentiment_context(df):
+    if df is None or df.empty:
+        return ""
+    lines = [f"- {t}: {r.mood} (score {r.score:.2f}, {r.n} articles)" if r.n else f"- {t}: No Coverage"
+             for t, r in df.iterrows()]
+    return "News sentiment (relevance-weighted):\n" + "\n".join(lines)
+
+def fetch_scanner_sentiment(tickers: list, alpha_vantage_key: str):
+    # One batched news call for the whole list instead of one per ticker; the
+    # market-wide feed is cached for a movers poll interval and kept in the news store
+    if not alpha_vantage_key:
+        return None
+    try:
+        return batch_news_sentiment(tickers, alpha_vantage_key, store=NewsStore())
+    except Exception:
+        return None
+
+def format_intraday_context(snapshots: dict):
+    rows = [s for s in (snapshots or {}).values() if s.get("last") is not None]
+    if not rows:
+        return ""
+    lines = [f"- {s['ticker']}: {s['chg_open_pct']:+.2f}% since open, {s['vwap_dist_pct']:+.2f}% vs VWAP, "
+             f"at {s['range_pos']:.0%} of today's range, RSI({s['bar']}) {s['rsi']:.0f}" for s in rows]
+    return "Today's price action (regular session):\n" + "\n".join(lines)
+
+def fetch_scanner_intraday(tickers: list, bar_size: str = SCANNER_INTRADAY_BAR) -> dict:
+    # Incremental intraday sync per ticker (yfinance, no quota); failures just drop the line
+    store = IntradayStore()
+
+    def snapshot(ticker):
+        try:
+            return ticker, session_snapshot(store.bars(ticker, bar_size, days=5), ticker, bar_size)
+        except Exception:
+            return ticker, None
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        return {t: s for t, s in pool.map(snapshot, tickers) if s}
+
+def create_market_scanner_crew(top_stocks: list, google_api_key: str, alpha_vantage_key: str = None, sentiment=None,
+                               router: ModelRouter = None, intraday: dict = None, max_rpm: int = RUN_MAX_RPM):
+    router = router or ModelRouter(google_api_key)
     
     stocks_str = ", ".join(top_stocks)
 
+    if sentiment is None:
+        sentiment = fetch_scanner_sentiment(top_stocks, alpha_vantage_key)
+    sentiment_context = format_sentiment_context(sentiment)
+    if intraday is None:
+        intraday = fetch_scanner_intraday(top_stocks)
+    intraday_context = format_intraday_context(intraday)
+
     trend_agent = Agent(
         role='Market Strategist',
         goal=f'Analyze the top market movers: {stocks_str}.',
         backstory="You analyze why stocks are moving today. You provide a buy/sell/hold verdict for short-term traders.",
         verbose=True,
         allow_delegation=False,
-        llm=llm
+        llm=router.llm_for('Market Strategist')
     )
 
     task_summary = Task(
         description=f"""
         The following stocks are today's Top Gainers: {stocks_str}.
+        {sentiment_context}
+        {intraday_context}
         
         For EACH stock, provide a brief analysis and a trading signal.
         Format EXACTLY as:
@@ -267,5 +471,58 @@ def create_market_scanner_crew(top_stocks: list, google_api_key: str):
         tasks=[task_summary],
         process=Process.sequential,
         verbose=True,
-        max_rpm=5
-    )
\ No newline at end of file
+        max_rpm=max_rpm
+    )
+
+def unavailable_sections(tickers: list, error: Exception) -> str:
+    """Placeholder `### Stock:` sections for a chunk whose crew failed, so its tickers still appear."""
+    return "\n\n".join(f"### Stock: {t}\n* **Signal:** N/A\n* **Reason:** ⚠️ analysis unavailable ({error})"
+                       for t in tickers)
+
+def merge_scanner_reports(reports: list, order: list) -> str:
+    """Joins per-chunk reports into one, one `### Stock:` section per ticker in ranking order."""
+    sections = {}
+    for report in reports:
+        for block in re.split(r"(?m)^(?=###\s*Stock:)", report):
+            match = re.match(r"###\s*Stock:\s*\[?([A-Za-z.\-]+)", block)
+            if match:
+                sections.setdefault(match.group(1).upper(), block.strip())
+    ranked = [sections.pop(t) for t in order if t in sections]
+    return "\n\n".join(ranked + list(sections.values()))
+
+def run_market_scan(candidates: list, google_api_key: str, alpha_vantage_key: str = None,
+                    top_k: int = SCANNER_TOP_K, chunk_size: int = SCANNER_CHUNK_SIZE,
+                    max_workers: int = SCANNER_MAX_WORKERS, router: ModelRouter = None,
+                    archive: ReportArchive = None) -> str:
+    """
+    Ranks candidates locally, sends only the top-k to the LLM in fixed-size
+    chunks analysed concurrently, and merges the results into one report
+    (archived with one call per stock).
+    """
+    router = router or ModelRouter(google_api_key)
+    archive = archive or ReportArchive()
+    ranked = rank_candidates(candidates, top_k) if len(candidates) > chunk_size else list(candidates)
+    sentiment = fetch_scanner_sentiment(ranked, alpha_vantage_key)
+    intraday = fetch_scanner_intraday(ranked)
+    chunks = [ranked[i:i + chunk_size] for i in range(0, len(ranked), chunk_size)]
+    chunk_rpm = max(1, RUN_MAX_RPM // min(max_workers, len(chunks) or 1))
+
+    def analyse(chunk):
+        chunk_sentiment = sentiment.reindex(chunk) if sentiment is not None else None
+        chunk_intraday = {t: intraday[t] for t in chunk if t in intraday}
+        crew = create_market_scanner_crew(chunk, google_api_key, sentiment=chunk_sentiment, router=router,
+                                          intraday=chunk_intraday, max_rpm=chunk_rpm)
+        return str(crew.kickoff())
+
+    # One failed chunk must not lose the others
+    reports = []
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = {pool.submit(analyse, chunk): chunk for chunk in chunks}
+        for future, chunk in futures.items():
+            try:
+                reports.append(future.result())
+            except Exception as e:
+                reports.append(unavailable_sections(chunk, e))
+    report = merge_scanner_reports(reports, ranked)
+    archive.add_scan(report)
+    return report
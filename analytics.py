@@ -0,0 +1,90 @@
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import ta
+
+from indicators import compute_indicators
+
+# History windows the tools have always used
+TECHNICALS_MONTHS = 6
+RISK_MONTHS = 12
+
+
+def trailing(df: pd.DataFrame, months: int) -> pd.DataFrame:
+    """Rows within `months` of the last bar, matching yfinance `period="6mo"` style windows."""
+    if df.empty:
+        return df
+    return df[df.index >= df.index[-1] - pd.DateOffset(months=months)]
+
+
+def compute_technicals(df: pd.DataFrame, ticker: str) -> dict:
+    """
+    RSI, MACD and SMA 50 of the latest bar, in the `technicals` schema.
+    One series at a time `ta` (pandas ewm/rolling) beats the fused kernel's
+    per-step loop; batches go through the kernel instead.
+    """
+    close = df['Close']
+    macd = ta.trend.MACD(close)
+    return {
+        "ticker": ticker,
+        "price": close.iloc[-1],
+        "rsi": ta.momentum.RSIIndicator(close).rsi().iloc[-1],
+        "macd": macd.macd().iloc[-1],
+        "macd_sig": macd.macd_signal().iloc[-1],
+        "sma50": ta.trend.SMAIndicator(close, window=50).sma_indicator().iloc[-1],
+    }
+
+
+def compute_technicals_batch(closes: dict) -> dict:
+    """
+    compute_technicals for many tickers with one fused-kernel call. Each ticker's
+    closes (already trimmed to its window) are right-aligned into a (T, N) block,
+    shorter histories padded with leading NaN, so the last row holds every
+    ticker's latest values and each column matches `ta` on its own series.
+    """
+    tickers = [t for t, c in closes.items() if len(c)]
+    if not tickers:
+        return {}
+    length = max(len(closes[t]) for t in tickers)
+    block = np.full((length, len(tickers)), np.nan)
+    for j, t in enumerate(tickers):
+        values = np.asarray(closes[t], dtype=np.float64)
+        block[length - len(values):, j] = values
+    ind = compute_indicators(block, sma_windows=(50,), ema_windows=())
+    return {
+        t: {
+            "ticker": t,
+            "price": block[-1, j],
+            "rsi": ind["rsi"][-1, j],
+            "macd": ind["macd"][-1, j],
+            "macd_sig": ind["macd_signal"][-1, j],
+            "sma50": ind["sma_50"][-1, j],
+        }
+        for j, t in enumerate(tickers)
+    }
+
+
+def compute_risk(df: pd.DataFrame, ticker: str) -> dict:
+    """Annualized volatility and max drawdown (both %), in the `risk` schema."""
+    close = df['Close']
+    volatility = close.pct_change().std() * np.sqrt(252) * 100
+    max_drawdown = (close / close.cummax() - 1.0).min() * 100
+    return {"ticker": ticker, "vol_pct": volatility, "mdd_pct": max_drawdown}
+
+
+def fundamentals_from_info(info: dict, ticker: str) -> dict:
+    """
+    yfinance `.info` -> the `fundamentals` schema. `price_asof` is the time of
+    `price`, so a row served from the nightly store is not read as a live quote.
+    """
+    quoted_at = info.get("regularMarketTime")
+    return {
+        "ticker": ticker,
+        "price": info.get("currentPrice"),
+        "mcap": info.get("marketCap"),
+        "pe": info.get("trailingPE"),
+        "sector": info.get("sector"),
+        "beta": info.get("beta"),
+        "price_asof": datetime.fromtimestamp(quoted_at).isoformat(timespec="minutes") if quoted_at else None,
+    }
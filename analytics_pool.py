@@ -0,0 +1,114 @@
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import pandas as pd
+import yfinance as yf
+
+from analytics import RISK_MONTHS, TECHNICALS_MONTHS, compute_risk, compute_technicals_batch, trailing
+from price_matrix import DEFAULT_PATH, load_shared_matrix
+
+DEFAULT_SHARD_SIZE = 10
+
+
+def _load_frames(tickers: list, matrix_path: str) -> dict:
+    """
+    OHLCV per ticker: zero-copy from the price matrix when it is fresh and has
+    them, else one bulk download (also when the matrix is missing or stale).
+    """
+    frames = {}
+    matrix = load_shared_matrix(matrix_path) if matrix_path else None
+    if matrix is not None:
+        frames = {t: matrix.frame(t) for t in tickers if t in matrix}
+
+    missing = [t for t in tickers if t not in frames]
+    if missing:
+        data = yf.download(missing, period=f"{RISK_MONTHS}mo", interval="1d", progress=False, group_by="ticker")
+        for t in missing:
+            if isinstance(data.columns, pd.MultiIndex):
+                if t in data.columns.get_level_values(0):
+                    frames[t] = data[t].dropna(how="all")
+            else:
+                frames[t] = data.dropna(how="all")
+    return frames
+
+
+def compute_shard(tickers: list, matrix_path: str = DEFAULT_PATH) -> list:
+    """
+    Worker entry point: technicals and risk for one shard of the universe.
+    Returns [(ticker, {"technicals": ..., "risk": ...} or {"error": ...})].
+    """
+    frames = {t: df for t, df in _load_frames(tickers, matrix_path).items() if df is not None and not df.empty}
+    # One batched kernel call for the whole shard instead of one per ticker
+    try:
+        technicals = compute_technicals_batch({t: trailing(df, TECHNICALS_MONTHS)["Close"] for t, df in frames.items()})
+        technicals_error = None
+    except Exception as e:
+        technicals, technicals_error = {}, str(e)
+
+    results = []
+    for t in tickers:
+        if t not in frames:
+            results.append((t, {"error": "No data."}))
+            continue
+        try:
+            if t not in technicals:
+                raise ValueError(technicals_error or "No closes.")
+            results.append((t, {
+                "technicals": technicals[t],
+                "risk": compute_risk(trailing(frames[t], RISK_MONTHS), t),
+            }))
+        except Exception as e:
+            results.append((t, {"error": str(e)}))
+    return results
+
+
+class AnalyticsExecutor:
+    """
+    Shards a universe across a process pool (sidestepping the GIL for pandas/ta work)
+    and streams per-ticker results back as each shard finishes.
+
+        executor = AnalyticsExecutor()
+        for ticker, result in executor.run(universe, on_progress=print):
+            ...
+        executor.cancel()  # from another thread: pending shards are dropped
+    """
+
+    def __init__(self, max_workers: int = None, shard_size: int = DEFAULT_SHARD_SIZE, matrix_path: str = DEFAULT_PATH):
+        self.max_workers = max_workers or os.cpu_count()
+        self.shard_size = shard_size
+        self.matrix_path = matrix_path
+        self._cancelled = threading.Event()
+
+    def cancel(self):
+        self._cancelled.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    def run(self, tickers: list, on_progress=None):
+        """Yields (ticker, result) pairs; `on_progress(done, total)` is called after each shard."""
+        self._cancelled.clear()
+        shards = [tickers[i:i + self.shard_size] for i in range(0, len(tickers), self.shard_size)]
+        done, total = 0, len(tickers)
+
+        pool = ProcessPoolExecutor(max_workers=min(self.max_workers, len(shards) or 1))
+        try:
+            futures = [pool.submit(compute_shard, shard, self.matrix_path) for shard in shards]
+            for future in as_completed(futures):
+                if self.cancelled:
+                    break
+                try:
+                    shard_results = future.result()
+                except Exception as e:
+                    shard = shards[futures.index(future)]
+                    shard_results = [(t, {"error": str(e)}) for t in shard]
+                for ticker, result in shard_results:
+                    yield ticker, result
+                done += len(shard_results)
+                if on_progress:
+                    on_progress(done, total)
+        finally:
+            # Drops shards that have not started; running ones finish in the background
+            pool.shutdown(wait=not self.cancelled, cancel_futures=True)
@@ -0,0 +1,106 @@
+import json
+import os
+import sqlite3
+from datetime import datetime
+
+import pandas as pd
+
+from price_matrix import last_completed_session
+
+DEFAULT_DB_PATH = os.path.join("data", "analytics.db")
+
+# Precomputed rows are trusted until the next nightly run is due: rows computed on or
+# after the last completed session's day are fresh (Friday night's rows last through
+# Monday), with this many sessions of slack for holidays and a missed run.
+MAX_LAG_SESSIONS = 1
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id TEXT PRIMARY KEY,
+    started_at TEXT,
+    finished_at TEXT,
+    status TEXT,
+    universe_size INTEGER,
+    manifest TEXT
+);
+CREATE TABLE IF NOT EXISTS precomputed (
+    ticker TEXT,
+    kind TEXT,
+    run_id TEXT,
+    computed_at TEXT,
+    payload TEXT,
+    PRIMARY KEY (ticker, kind)
+);
+"""
+
+
+def _to_json(payload) -> str:
+    # numpy scalars expose .item(); anything else falls back to str
+    return json.dumps(payload, default=lambda v: v.item() if hasattr(v, "item") else str(v))
+
+
+class AnalyticsStore:
+    """
+    Latest precomputed payload per (ticker, kind) -- kinds are the serializer
+    schemas such as "technicals", "risk", "fundamentals", "screening" -- plus a
+    manifest row per pipeline run.
+    """
+
+    def __init__(self, path: str = DEFAULT_DB_PATH):
+        self.path = path
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+
+    def _connect(self):
+        return sqlite3.connect(self.path)
+
+    def start_run(self, universe_size: int) -> str:
+        run_id = datetime.now().strftime("%Y%m%dT%H%M%S")
+        with self._connect() as conn:
+            conn.execute("INSERT OR REPLACE INTO runs VALUES (?, ?, NULL, 'running', ?, NULL)",
+                         (run_id, datetime.now().isoformat(timespec="seconds"), universe_size))
+        return run_id
+
+    def finish_run(self, run_id: str, status: str, manifest: dict):
+        with self._connect() as conn:
+            conn.execute("UPDATE runs SET finished_at = ?, status = ?, manifest = ? WHERE run_id = ?",
+                         (datetime.now().isoformat(timespec="seconds"), status, _to_json(manifest), run_id))
+
+    def save(self, run_id: str, kind: str, rows: dict):
+        """Upserts {ticker: payload} for one kind."""
+        computed_at = datetime.now().isoformat(timespec="seconds")
+        with self._connect() as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO precomputed VALUES (?, ?, ?, ?, ?)",
+                [(t, kind, run_id, computed_at, _to_json(p)) for t, p in rows.items()],
+            )
+
+    def load(self, ticker: str, kind: str, max_lag_sessions: int = MAX_LAG_SESSIONS):
+        """The precomputed payload, or None on a miss or if it predates the sessions it may lag by."""
+        return self.load_many([ticker], kind, max_lag_sessions).get(ticker.upper())
+
+    def load_many(self, tickers: list, kind: str, max_lag_sessions: int = MAX_LAG_SESSIONS) -> dict:
+        """{ticker: payload} for the tickers that have a fresh row of this kind."""
+        cutoff = (last_completed_session() - pd.offsets.BDay(max_lag_sessions)).isoformat()
+        tickers = [t.upper() for t in tickers]
+        with self._connect() as conn:
+            rows = conn.execute(
+                f"SELECT ticker, payload FROM precomputed WHERE kind = ? AND computed_at >= ? "
+                f"AND ticker IN ({','.join('?' * len(tickers))})",
+                [kind, cutoff, *tickers],
+            ).fetchall()
+        return {t: json.loads(p) for t, p in rows}
+
+    def last_run(self):
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT run_id, started_at, finished_at, status, universe_size, manifest FROM runs ORDER BY started_at DESC LIMIT 1"
+            ).fetchone()
+        if not row:
+            return None
+        keys = ["run_id", "started_at", "finished_at", "status", "universe_size", "manifest"]
+        run = dict(zip(keys, row))
+        run["manifest"] = json.loads(run["manifest"]) if run["manifest"] else None
+        return run
@@ -1,13 +1,19 @@
 import streamlit as st
-from agents import create_single_stock_crew, create_market_scanner_crew
+from agents import run_single_stock_analysis, run_market_scan, DEFAULT_RUN_DEADLINE
 import os
 from dotenv import load_dotenv
 import yfinance as yf
 import pandas as pd
 import plotly.graph_objects as go
 import re
-import requests
+import threading
 from datetime import datetime, timedelta
+from movers import MoversRecorder, local_market_movers
+from intraday import IntradayStore
+from report_archive import ReportArchive, CALLS
+from live import LiveWatch, PollingFeed, ReplayFeed, POLL_INTERVAL, CANDLE_HISTORY, candles_frame
+from universe import load_universe
+from llm_router import ModelRouter
 
 # Load environment variables
 load_dotenv()
@@ -24,23 +30,63 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-# --- HELPER: ALPHA VANTAGE FETCHER ---
-def fetch_top_gainers(api_key):
-    """Fetches top gainers directly from Alpha Vantage API"""
-    url = f"https://www.alphavantage.co/query?function=TOP_GAINERS_LOSERS&apikey={api_key}"
+# --- HELPER: SHARED MODEL ROUTER ---
+@st.cache_resource
+def get_model_router(api_key):
+    """One router per server so latency / error stats accumulate across runs"""
+    return ModelRouter(api_key)
+
+# --- HELPER: SHARED MARKET MOVERS RECORDER ---
+@st.cache_resource
+def get_movers_recorder(api_key):
+    """One recorder and polling thread per server, shared by every session"""
+    recorder = MoversRecorder()
+    stop_event = threading.Event()
+    threading.Thread(target=recorder.run_forever, args=(api_key, stop_event), daemon=True).start()
+    return recorder
+
+def fetch_top_gainers(api_key, limit=20):
+    """Top gainers from the latest recorded snapshot (polls only if stale)"""
     try:
-        response = requests.get(url)
-        data = response.json()
-        if "top_gainers" in data:
-            return data["top_gainers"][:5] # Return top 5
+        recorder = get_movers_recorder(api_key)
+        recorder.poll_if_due(api_key)
+        return recorder.latest("gainers", limit)
+    except:
         return []
+
+@st.cache_data(ttl=60)
+def fetch_local_gainers(universe, limit=20):
+    """Top gainers ranked locally from a bulk Yahoo quote snapshot (no Alpha Vantage quota)"""
+    try:
+        return local_market_movers(list(universe), limit=limit)["top_gainers"]
     except:
         return []
 
+# --- HELPER: SHARED LIVE WATCH ---
+# Evicted, idle or finished watches stop their polling thread and are rebuilt on the next visit
+@st.cache_resource(max_entries=8, validate=lambda watch: watch.running, on_release=lambda watch: watch.stop())
+def get_live_watch(tickers, feed_kind, bar_seconds):
+    """One feed and polling thread per watchlist, shared by every session watching it"""
+    if feed_kind == "Replay (simulated)":
+        watch, interval = LiveWatch(ReplayFeed.simulated(list(tickers), bar_seconds=bar_seconds), list(tickers), bar_seconds), 1
+    else:
+        watch, interval = LiveWatch(PollingFeed(list(tickers)), list(tickers), bar_seconds), POLL_INTERVAL
+        watch.warm()
+    return watch.start(interval)
+
+@st.cache_data(ttl=60)
+def fetch_intraday_bars(ticker, bar_size, days, extended_hours):
+    """Intraday OHLCV at any bar size, resampled from the incrementally synced local store"""
+    try:
+        return IntradayStore().bars(ticker, bar_size, days=days, regular_only=not extended_hours)
+    except:
+        return pd.DataFrame()
+
 # --- STATE MANAGEMENT ---
 if "single_analysis" not in st.session_state: st.session_state.single_analysis = None
 if "scanner_report" not in st.session_state: st.session_state.scanner_report = None
 if "current_ticker" not in st.session_state: st.session_state.current_ticker = None
+if "model_log" not in st.session_state: st.session_state.model_log = []
 
 # --- SIDEBAR ---
 with st.sidebar:
@@ -61,7 +107,7 @@ with st.sidebar:
     st.success("✅ API Keys Loaded")
     st.markdown("---")
     
-    app_mode = st.radio("Select Mode:", ["Single Ticker Analysis", "Market Trend Scanner"])
+    app_mode = st.radio("Select Mode:", ["Single Ticker Analysis", "Market Trend Scanner", "Live Watch", "Report Archive"])
 
 # --- MAIN APP ---
 
@@ -77,6 +123,11 @@ if app_mode == "Single Ticker Analysis":
     with col2:
         end_date = st.date_input("End Date", datetime.now())
 
+    local_sentiment = st.checkbox("Score news locally (saves Alpha Vantage quota)")
+    regenerate_report = st.checkbox("Regenerate final report from cached analyst work")
+    reuse_recent = st.checkbox("Reuse a report from the last 6 hours for the same ticker and dates", value=True)
+    run_deadline = st.number_input("Report deadline (seconds)", min_value=15, max_value=600, value=DEFAULT_RUN_DEADLINE, step=15)
+
     if st.button("🚀 Analyze Stock"):
         # Reset previous session data if ticker changes or new run requested
         st.session_state.single_analysis = None
@@ -84,14 +135,29 @@ if app_mode == "Single Ticker Analysis":
         
         with st.status("🤖 AI Agents Working...", expanded=True) as status:
             try:
-                # 1. Run Crew
-                status.write(f"🧠 Analyzing {ticker} from {start_date} to {end_date}...")
-                
-                # Pass dates to the crew
-                crew = create_single_stock_crew(ticker, str(start_date), str(end_date), google_key, av_key)
-                result = crew.kickoff()
-                
-                st.session_state.single_analysis = str(result)
+                archived = None
+                if reuse_recent and not regenerate_report:
+                    archived = ReportArchive().reusable(ticker, str(start_date), str(end_date))
+                if archived:
+                    status.write(f"📚 Reusing the report archived at {archived['created_at']}")
+                    st.session_state.single_analysis = archived["body"]
+                    st.session_state.model_log = []
+                else:
+                    # 1. Run Crew
+                    status.write(f"🧠 Analyzing {ticker} from {start_date} to {end_date}...")
+
+                    # Pass dates to the crew
+                    sentiment_mode = "local" if local_sentiment else "alpha_vantage"
+                    # The router is shared by every session; this run logs its own calls
+                    model_log = []
+                    # Sections that miss the deadline are marked in the report instead of blocking it
+                    result, _ = run_single_stock_analysis(ticker, str(start_date), str(end_date), google_key, av_key,
+                                                          sentiment_mode, get_model_router(google_key),
+                                                          deadline_seconds=run_deadline,
+                                                          regenerate_report=regenerate_report, model_log=model_log)
+
+                    st.session_state.single_analysis = str(result)
+                    st.session_state.model_log = model_log
                 status.update(label="Complete", state="complete", expanded=False)
             except Exception as e:
                 st.error(f"Error: {e}")
@@ -108,9 +174,13 @@ if app_mode == "Single Ticker Analysis":
             mime="text/plain"
         )
 
+        with st.expander("🛰️ Model Routing"):
+            st.dataframe(pd.DataFrame(st.session_state.model_log), use_container_width=True)
+
 elif app_mode == "Market Trend Scanner":
     st.markdown("## 🌍 Real-Time Market Scanner")
     st.info("Fetches Top Gainers from Alpha Vantage and analyzes them.")
+    movers_source = st.radio("Movers Source:", ["Alpha Vantage", "Local Universe"], horizontal=True)
     
     if st.button("🔍 Scan Top Gainers"):
         # Clear previous scan results
@@ -118,28 +188,61 @@ elif app_mode == "Market Trend Scanner":
         
         with st.status("Scanning Market...", expanded=True) as status:
             try:
-                status.write("📡 Fetching Top Gainers from Alpha Vantage...")
-                gainers_data = fetch_top_gainers(av_key)
+                gainers_data = []
+                if movers_source == "Alpha Vantage":
+                    status.write("📡 Fetching Top Gainers from Alpha Vantage...")
+                    gainers_data = fetch_top_gainers(av_key)
+                    if not gainers_data:
+                        st.warning("Alpha Vantage unavailable (Check API Key or Limit). Ranking the local universe instead.")
                 
                 if not gainers_data:
-                    st.error("Failed to fetch gainers (Check API Key or Limit). Using fallback.")
+                    status.write("📡 Ranking local universe from Yahoo Finance quotes...")
+                    gainers_data = fetch_local_gainers(tuple(load_universe()))
+                
+                if not gainers_data:
+                    st.error("Failed to fetch gainers. Using fallback.")
                     top_tickers = ['NVDA', 'TSLA', 'AMD'] # Fallback
                 else:
                     top_tickers = [g['ticker'] for g in gainers_data]
-                    # Display Gainers
-                    cols = st.columns(len(top_tickers))
-                    for i, t in enumerate(top_tickers):
-                        cols[i].metric(t, f"+{gainers_data[i]['change_percentage']}")
-
-                status.write(f"🧠 AI Analyzing: {', '.join(top_tickers)}")
-                crew = create_market_scanner_crew(top_tickers, google_key)
-                report = crew.kickoff()
-                st.session_state.scanner_report = str(report)
+                    # Display Top 5 Gainers
+                    cols = st.columns(min(len(top_tickers), 5))
+                    for i, t in enumerate(top_tickers[:5]):
+                        cols[i].metric(t, f"{float(gainers_data[i]['change_percentage'].rstrip('%')):+.2f}%")
+
+                # Candidates are pre-ranked locally; only the top-k reach the AI, in parallel chunks
+                status.write(f"🧠 AI Analyzing top candidates from: {', '.join(top_tickers)}")
+                report = run_market_scan(top_tickers, google_key, av_key, router=get_model_router(google_key))
+                st.session_state.scanner_report = report
                 
                 status.update(label="Complete", state="complete", expanded=False)
             except Exception as e:
                 st.error(f"Scan Error: {e}")
 
+    with st.expander("🕒 Today's Gainers List Changes"):
+        changes = get_movers_recorder(av_key).membership_changes("gainers")
+        if changes.empty:
+            st.caption("No snapshots recorded today yet.")
+        else:
+            st.dataframe(changes, use_container_width=True)
+
+    with st.expander("📊 Intraday Chart"):
+        c1, c2, c3 = st.columns(3)
+        chart_ticker = c1.text_input("Ticker", value="NVDA", key="intraday_ticker").upper()
+        bar_size = c2.selectbox("Bar Size", ["1m", "5m", "15m", "30m", "1h", "1d"], index=2)
+        chart_days = c3.slider("Days", 1, 30, 5)
+        extended_hours = st.checkbox("Include pre-market / after-hours")
+        bars = fetch_intraday_bars(chart_ticker, bar_size, chart_days, extended_hours)
+        if bars.empty:
+            st.caption("No intraday data (Yahoo serves 1m bars for the last 7 days, 5m/15m for 60).")
+        else:
+            fig = go.Figure(go.Candlestick(x=bars.index, open=bars["Open"], high=bars["High"],
+                                           low=bars["Low"], close=bars["Close"]))
+            # Hide overnight and weekend gaps so sessions sit side by side
+            session_hours = [20, 4] if extended_hours else [16, 9.5]
+            fig.update_xaxes(rangebreaks=[dict(bounds=["sat", "mon"]), dict(bounds=session_hours, pattern="hour")])
+            fig.update_layout(template="plotly_dark", height=420, xaxis_rangeslider_visible=False)
+            st.plotly_chart(fig, use_container_width=True)
+
     if st.session_state.scanner_report:
         st.markdown("### 🧠 Strategic Analysis")
         # Color coding logic
@@ -147,4 +250,80 @@ elif app_mode == "Market Trend Scanner":
         report_html = report_html.replace("Signal: PROFIT-TAKE", "Signal: <span style='color:#f87171;font-weight:bold'>PROFIT-TAKE</span>")
         report_html = report_html.replace("Signal: HOLD", "Signal: <span style='color:#facc15;font-weight:bold'>HOLD</span>")
         
-        st.markdown(report_html, unsafe_allow_html=True)
\ No newline at end of file
+        st.markdown(report_html, unsafe_allow_html=True)
+
+elif app_mode == "Live Watch":
+    st.markdown("## 📡 Live Watch")
+    watchlist = st.text_input("Watchlist (comma-separated)", value="AAPL, MSFT, NVDA, AMD, TSLA")
+    c1, c2, c3 = st.columns(3)
+    feed_kind = c1.radio("Feed", ["Yahoo polling", "Replay (simulated)"])
+    candle_size = c2.selectbox("Candle", ["1m", "5m"])
+    refresh = c3.slider("Refresh (seconds)", 1, 30, 5)
+    watch_tickers = tuple(dict.fromkeys(t.strip().upper() for t in watchlist.split(",") if t.strip()))
+
+    if watch_tickers:
+        watch = get_live_watch(watch_tickers, feed_kind, 60 if candle_size == "1m" else 300)
+        chart_ticker = st.selectbox("Chart", watch_tickers)
+
+        # Baseline once per watch / chart; afterwards the page only merges deltas
+        live_key = (id(watch), chart_ticker)
+        if st.session_state.get("live_key") != live_key:
+            st.session_state.live_key = live_key
+            st.session_state.live_version = watch.version  # read first: later changes are re-sent, never lost
+            st.session_state.live_table = watch.snapshot().to_dict("index")
+            st.session_state.live_candles = {row[0]: row for row in watch.candle_rows(chart_ticker)}
+
+        @st.fragment(run_every=refresh)
+        def live_panel():
+            version, changes = watch.updates(st.session_state.live_version)
+            st.session_state.live_version = version
+            table, candles = st.session_state.live_table, st.session_state.live_candles
+            for t, change in changes.items():
+                table.setdefault(t, {}).update(change["metrics"])
+                if t == chart_ticker:
+                    candles.update({c[0]: c for c in change["candles"]})
+            while len(candles) > CANDLE_HISTORY:
+                candles.pop(next(iter(candles)))
+
+            st.caption(f"Update #{version} · {len(changes)} of {len(watch_tickers)} tickers changed")
+            st.dataframe(pd.DataFrame.from_dict(table, orient="index"), use_container_width=True)
+            if candles:
+                bars = candles_frame(list(candles.values()))
+                fig = go.Figure(go.Candlestick(x=bars.index, open=bars["Open"], high=bars["High"],
+                                               low=bars["Low"], close=bars["Close"]))
+                fig.update_layout(template="plotly_dark", height=380, xaxis_rangeslider_visible=False,
+                                  margin=dict(l=0, r=0, t=0, b=0))
+                st.plotly_chart(fig, use_container_width=True)
+
+        live_panel()
+
+elif app_mode == "Report Archive":
+    st.markdown("## 📚 Report Archive")
+    archive = ReportArchive()
+
+    st.markdown("#### Calls")
+    c1, c2, c3, c4 = st.columns(4)
+    calls = c1.multiselect("Call", CALLS)
+    call_ticker = c2.text_input("Ticker", key="archive_ticker").upper()
+    sector = c3.text_input("Sector / Industry contains", placeholder="e.g. Semiconductor")
+    since = c4.date_input("Since", datetime.now() - timedelta(days=30))
+    found = archive.search_calls(call=calls or None, ticker=call_ticker or None, sector=sector or None, since=str(since))
+    st.dataframe(found, use_container_width=True)
+
+    st.markdown("#### Full-Text Search")
+    query = st.text_input("Search report text", placeholder='e.g. "guidance cut" OR downgrade*')
+    if query:
+        try:
+            hits = archive.search(query, ticker=call_ticker or None)
+            st.dataframe(hits, use_container_width=True)
+        except Exception as e:
+            st.error(f"Invalid search: {e}")
+
+    report_id = st.number_input("Open report #", min_value=0, value=0, step=1)
+    if report_id:
+        report = archive.get(int(report_id))
+        if report:
+            st.caption(f"{report['kind']} · {report['ticker'] or 'scan'} · {report['created_at']}")
+            st.markdown(report["body"])
+        else:
+            st.caption("No report with that id.")
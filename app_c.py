@@ -1,11 +1,13 @@
 import streamlit as st
-from agents import create_single_stock_crew
+from agents import run_single_stock_analysis
+from report_archive import ReportArchive, extract_report_fields
+from live import LiveWatch, PollingFeed, POLL_INTERVAL, CANDLE_HISTORY, candles_frame
+from price_matrix import load_shared_matrix
 import os
 from dotenv import load_dotenv
 import yfinance as yf
 import pandas as pd
 import plotly.graph_objects as go
-import re
 from datetime import datetime, timedelta
 
 # Load environment variables
@@ -89,6 +91,27 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
+# --- SHARED LIVE WATCH (one polling thread per ticker per server) ---
+# Evicted or idle watches stop their polling thread and are rebuilt on the next visit
+@st.cache_resource(max_entries=8, validate=lambda watch: watch.running, on_release=lambda watch: watch.stop())
+def get_live_watch(ticker):
+    watch = LiveWatch(PollingFeed([ticker]), [ticker])
+    watch.warm()
+    return watch.start()
+
+# --- PRICE HISTORY (mapped from the shared price matrix, never copied into a session) ---
+def matrix_history(ticker, start, end):
+    """Daily bars for the window from the shared matrix, or None if it does not cover them."""
+    matrix = load_shared_matrix()
+    if matrix is None or ticker not in matrix or matrix.dates[0] > pd.Timestamp(start):
+        return None
+    hist = matrix.frame(ticker)
+    # The nightly matrix has no bar for today's session, so a window ending today is downloaded
+    last_session = pd.offsets.BDay().rollback(pd.Timestamp(end))
+    if hist.empty or hist.index[-1] < last_session:
+        return None
+    return hist.loc[str(start):str(end)]
+
 # --- SESSION STATE INITIALIZATION ---
 if "analysis_result" not in st.session_state:
     st.session_state.analysis_result = None
@@ -96,6 +119,8 @@ if "market_data" not in st.session_state:
     st.session_state.market_data = None
 if "current_ticker" not in st.session_state:
     st.session_state.current_ticker = ""
+if "report_fields" not in st.session_state:
+    st.session_state.report_fields = None
 
 # --- SIDEBAR CONFIGURATION ---
 with st.sidebar:
@@ -148,16 +173,21 @@ if run_btn and ticker:
                 # A. Fetch Market Data
                 status.write("📡 Connecting to Market Data Feed...")
                 stock = yf.Ticker(ticker)
-                hist = stock.history(start=start_date, end=end_date)
+                hist = matrix_history(ticker, start_date, end_date)
+                from_matrix = hist is not None and not hist.empty
+                if not from_matrix:
+                    hist = stock.history(start=start_date, end=end_date)
                 info = stock.info
                 
                 if hist.empty:
                     st.error(f"Could not fetch data for {ticker}. Check symbol/dates.")
                     st.stop()
                 
-                # Store market data in session
+                # Store market data in session; matrix-backed history is re-mapped on each render
                 st.session_state.market_data = {
-                    "hist": hist,
+                    "hist": None if from_matrix else hist,
+                    "start": start_date,
+                    "end": end_date,
                     "info": info,
                     "ticker": ticker
                 }
@@ -168,11 +198,20 @@ if run_btn and ticker:
                 status.write("📉 Technical Analyst measuring trends...")
                 status.write("🛡️ Risk Officer running simulations...")
                 
-                crew = create_single_stock_crew(ticker, api_key)
-                result = crew.kickoff()
+                # A complete report on the same window from the last few hours is reused as is
+                archive = ReportArchive()
+                report = archive.reusable(ticker, str(start_date), str(end_date))
+                if report is None:
+                    av_key = os.getenv("ALPHA_VANTAGE_API_KEY")
+                    result, report_id = run_single_stock_analysis(ticker, str(start_date), str(end_date), api_key, av_key,
+                                                                  sentiment_mode="alpha_vantage" if av_key else "local")
+                    # The row this run wrote; a report served from checkpoints was not archived again
+                    report = (archive.get(report_id) if report_id is not None else None) \
+                        or {"body": str(result), **extract_report_fields(str(result))}
                 
-                # Store analysis in session
-                st.session_state.analysis_result = str(result)
+                # Store analysis in session (fields were extracted once, when archived)
+                st.session_state.analysis_result = report["body"]
+                st.session_state.report_fields = report
                 st.session_state.current_ticker = ticker
                 
                 status.write("✅ Analysis Finalized.")
@@ -188,6 +227,10 @@ if st.session_state.analysis_result and st.session_state.market_data:
     # Load data from state
     data = st.session_state.market_data
     hist = data["hist"]
+    if hist is None:
+        hist = matrix_history(data["ticker"], data["start"], data["end"])
+        if hist is None:  # the matrix was replaced by one that no longer covers the window
+            hist = yf.Ticker(data["ticker"]).history(start=data["start"], end=data["end"])
     info = data["info"]
     result_text = st.session_state.analysis_result
     active_ticker = st.session_state.current_ticker
@@ -207,7 +250,7 @@ if st.session_state.analysis_result and st.session_state.market_data:
     col4.metric("52W High", f"${info.get('fiftyTwoWeekHigh', 0)}")
 
     # TABS LAYOUT
-    tab1, tab2, tab3 = st.tabs(["📉 Market Overview", "🧠 AI Deep Dive", "📝 Raw Data"])
+    tab1, tab2, tab3, tab4 = st.tabs(["📉 Market Overview", "🧠 AI Deep Dive", "📝 Raw Data", "⚡ Live"])
 
     # TAB 1: Charts
     with tab1:
@@ -229,12 +272,10 @@ if st.session_state.analysis_result and st.session_state.market_data:
 
     # TAB 2: AI Report
     with tab2:
-        # Parse Recommendation
-        rec_match = re.search(r"Recommendation:\*\*?\s*(.*)", result_text, re.IGNORECASE)
-        confidence_match = re.search(r"Confidence Score:\*\*?\s*(\d+%)", result_text, re.IGNORECASE)
-        
-        rec_text = rec_match.group(1).strip() if rec_match else "N/A"
-        confidence_text = confidence_match.group(1).strip() if confidence_match else "N/A"
+        # Recommendation / confidence come from the archive record
+        fields = st.session_state.report_fields or {}
+        rec_text = fields.get("recommendation") or "N/A"
+        confidence_text = f"{fields['confidence']}%" if fields.get("confidence") is not None else "N/A"
 
         # Dynamic Color Logic
         if "BUY" in rec_text.upper():
@@ -286,6 +327,47 @@ if st.session_state.analysis_result and st.session_state.market_data:
         st.subheader("Company Info")
         st.json(info)
 
+    # TAB 4: Live quotes (only changed metrics and the newest candles reach the page)
+    with tab4:
+        # Tabs render on every run, so the polling thread starts only once the user turns it on
+        if not st.toggle("Stream live quotes", key="live_enabled"):
+            st.caption("Turn on to poll quotes for this ticker while the tab is open.")
+        else:
+            watch = get_live_watch(active_ticker)
+            if st.session_state.get("live_watch_id") != id(watch):
+                st.session_state.live_watch_id = id(watch)
+                st.session_state.live_version = watch.version
+                st.session_state.live_metrics = watch.snapshot().loc[active_ticker].to_dict()
+                st.session_state.live_candles = {row[0]: row for row in watch.candle_rows(active_ticker)}
+
+            @st.fragment(run_every=POLL_INTERVAL)
+            def live_tab():
+                version, changes = watch.updates(st.session_state.live_version)
+                st.session_state.live_version = version
+                change = changes.get(active_ticker, {})
+                st.session_state.live_metrics.update(change.get("metrics", {}))
+                st.session_state.live_candles.update({c[0]: c for c in change.get("candles", [])})
+                while len(st.session_state.live_candles) > CANDLE_HISTORY:
+                    st.session_state.live_candles.pop(next(iter(st.session_state.live_candles)))
+
+                m = st.session_state.live_metrics
+                fmt = lambda v, spec: "N/A" if v is None or pd.isna(v) else format(v, spec)
+                c1, c2, c3, c4 = st.columns(4)
+                c1.metric("Last", fmt(m.get("price"), ",.2f"), f"{fmt(m.get('chg_pct'), '+.2f')}%")
+                c2.metric("VWAP", fmt(m.get("vwap"), ",.2f"))
+                c3.metric("RSI (1m)", fmt(m.get("rsi"), ".1f"))
+                c4.metric("Intraday Drawdown", f"{fmt(m.get('mdd_pct'), '.2f')}%")
+
+                bars = candles_frame(list(st.session_state.live_candles.values()))
+                if not bars.empty:
+                    fig = go.Figure(go.Candlestick(x=bars.index, open=bars['Open'], high=bars['High'],
+                                                   low=bars['Low'], close=bars['Close']))
+                    fig.update_layout(template="plotly_dark", height=400, xaxis_rangeslider_visible=False,
+                                      margin=dict(l=0, r=0, t=0, b=0))
+                    st.plotly_chart(fig, use_container_width=True)
+
+            live_tab()
+
 elif not run_btn and not st.session_state.analysis_result:
     # Landing Page State
     st.info("👈 Enter a stock ticker in the sidebar and click 'Run Analysis' to begin.")
@@ -0,0 +1,87 @@
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+import ta
+
+from analytics import compute_technicals, compute_technicals_batch
+from indicators import compute_indicators
+
+# ---------------------------------------------------------
+# Speed / memory of the fused indicator kernel vs `ta`
+#   python bench_indicators.py   (parity: pytest test_indicators.py)
+# ---------------------------------------------------------
+TICKERS = 500
+DAYS = 252
+SHARD = 10      # analytics_pool.DEFAULT_SHARD_SIZE
+
+
+def synthetic_prices(n_tickers, n_days, seed=7):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, (n_days, n_tickers)), axis=0))
+    high = close * (1 + rng.uniform(0, 0.02, close.shape))
+    low = close * (1 - rng.uniform(0, 0.02, close.shape))
+    volume = rng.integers(100_000, 5_000_000, close.shape).astype(float)
+    return close, high, low, volume
+
+
+def ta_indicators(close, high, low, volume):
+    """The same set of indicators, computed the way the tools used to (one `ta` object each)."""
+    c, h, l, v = pd.Series(close), pd.Series(high), pd.Series(low), pd.Series(volume)
+    macd = ta.trend.MACD(c)
+    bb = ta.volatility.BollingerBands(c)
+    atr = ta.volatility.AverageTrueRange(h, l, c).average_true_range().to_numpy(copy=True)
+    atr[:13] = np.nan  # `ta` pads the warm-up with zeros, the kernel with NaN
+    return {
+        "rsi": ta.momentum.RSIIndicator(c).rsi(),
+        "macd": macd.macd(),
+        "macd_signal": macd.macd_signal(),
+        "macd_diff": macd.macd_diff(),
+        "sma_20": ta.trend.SMAIndicator(c, 20).sma_indicator(),
+        "sma_50": ta.trend.SMAIndicator(c, 50).sma_indicator(),
+        "ema_20": ta.trend.EMAIndicator(c, 20).ema_indicator(),
+        "ema_50": ta.trend.EMAIndicator(c, 50).ema_indicator(),
+        "bb_mavg": bb.bollinger_mavg(),
+        "bb_hband": bb.bollinger_hband(),
+        "bb_lband": bb.bollinger_lband(),
+        "atr": atr,
+        "obv": ta.volume.OnBalanceVolumeIndicator(c, v).on_balance_volume(),
+    }
+
+
+def measure(fn):
+    """Wall time of a clean run and peak traced allocations, measured separately."""
+    started = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - started
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak / 1e6
+
+
+if __name__ == "__main__":
+    close, high, low, volume = synthetic_prices(TICKERS, DAYS)
+
+    print(f"⏱️  {TICKERS} tickers x {DAYS} days:")
+    ta_time, ta_mem = measure(lambda: [ta_indicators(close[:, j], high[:, j], low[:, j], volume[:, j]) for j in range(TICKERS)])
+    fused_time, fused_mem = measure(lambda: compute_indicators(close, high, low, volume))
+    ta_single_time, _ = measure(lambda: ta_indicators(close[:, 0], high[:, 0], low[:, 0], volume[:, 0]))
+    single_time, _ = measure(lambda: compute_indicators(close[:, 0], high[:, 0], low[:, 0], volume[:, 0]))
+
+    print("-" * 50)
+    print(f"   ta (per ticker)   : {ta_time:8.3f}s  peak {ta_mem:8.1f} MB")
+    print(f"   fused (batch)     : {fused_time:8.3f}s  peak {fused_mem:8.1f} MB")
+    print(f"   ta (1 ticker)     : {ta_single_time * 1000:8.2f}ms")
+    print(f"   fused (1 ticker)  : {single_time * 1000:8.2f}ms  (the per-step loop only pays off on batches)")
+    # What one pool worker does per shard: technicals for SHARD tickers on ~6 months of closes
+    shard = {j: pd.Series(close[-126:, j]) for j in range(SHARD)}
+    loop_time, _ = measure(lambda: [compute_technicals(s.to_frame("Close"), j) for j, s in shard.items()])
+    shard_time, _ = measure(lambda: compute_technicals_batch(shard))
+
+    print("-" * 50)
+    print(f"   shard of {SHARD}: ta loop {loop_time * 1000:6.2f}ms  |  one kernel call {shard_time * 1000:6.2f}ms")
+    print("-" * 50)
+    print(f"   Speedup: {ta_time / fused_time:.1f}x")
@@ -0,0 +1,64 @@
+import hashlib
+import json
+import os
+import sqlite3
+from datetime import datetime, timedelta
+
+DEFAULT_DB_PATH = os.path.join("data", "checkpoints.db")
+
+# Outputs older than this are ignored, since "today" keeps moving for open-ended windows
+DEFAULT_MAX_AGE = timedelta(hours=6)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS task_outputs (
+    run_key TEXT,
+    task_name TEXT,
+    output TEXT,
+    created_at TEXT,
+    PRIMARY KEY (run_key, task_name)
+);
+"""
+
+
+def make_run_key(**parts) -> str:
+    """Stable hash of everything that determines a task's output (ticker, dates, models, prompt version...)."""
+    return hashlib.sha1(json.dumps(parts, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+class CheckpointStore:
+    """Persists each task's output under a run key as soon as the task finishes."""
+
+    def __init__(self, path: str = DEFAULT_DB_PATH, max_age: timedelta = DEFAULT_MAX_AGE):
+        self.path = path
+        self.max_age = max_age
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+
+    def _connect(self):
+        return sqlite3.connect(self.path)
+
+    def save(self, run_key: str, task_name: str, output: str):
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO task_outputs VALUES (?, ?, ?, ?)",
+                (run_key, task_name, output, datetime.now().isoformat(timespec="seconds")),
+            )
+
+    def load(self, run_key: str) -> dict:
+        """Fresh outputs for a run, keyed by task name."""
+        cutoff = (datetime.now() - self.max_age).isoformat(timespec="seconds")
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT task_name, output FROM task_outputs WHERE run_key = ? AND created_at >= ?",
+                (run_key, cutoff),
+            ).fetchall()
+        return dict(rows)
+
+    def discard(self, run_key: str, task_name: str = None):
+        with self._connect() as conn:
+            if task_name:
+                conn.execute("DELETE FROM task_outputs WHERE run_key = ? AND task_name = ?", (run_key, task_name))
+            else:
+                conn.execute("DELETE FROM task_outputs WHERE run_key = ?", (run_key,))
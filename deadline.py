@@ -0,0 +1,79 @@
+import contextvars
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+# Default per-request network timeout when no run deadline is active
+DEFAULT_TIMEOUT = 15.0
+
+
+_POOL = ThreadPoolExecutor(max_workers=8, thread_name_prefix="bounded-call")
+
+
+class DeadlineExceeded(TimeoutError):
+    pass
+
+
+class Deadline:
+    """Absolute point in time by which a whole analysis run must finish."""
+
+    def __init__(self, seconds: float):
+        self.seconds = seconds
+        self.expires_at = time.monotonic() + seconds
+
+    def remaining(self) -> float:
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def expired(self) -> bool:
+        return self.remaining() <= 0
+
+    def child(self, reserve: float) -> "Deadline":
+        """A deadline that ends `reserve` seconds earlier, e.g. to leave room for the manager."""
+        return Deadline(max(0.0, self.remaining() - reserve))
+
+
+_current = contextvars.ContextVar("run_deadline", default=None)
+
+
+@contextmanager
+def deadline_scope(deadline: Deadline):
+    """Makes `deadline` visible to every tool and LLM call made in this context."""
+    token = _current.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _current.reset(token)
+
+
+def current_deadline():
+    return _current.get()
+
+
+def check_deadline():
+    """Raises DeadlineExceeded if the active run deadline has passed."""
+    deadline = _current.get()
+    if deadline is not None and deadline.expired():
+        raise DeadlineExceeded("Run deadline exceeded")
+
+
+def request_timeout(default: float = DEFAULT_TIMEOUT) -> float:
+    """Network timeout for the next call: the default, capped by the time left in the run."""
+    check_deadline()
+    deadline = _current.get()
+    return default if deadline is None else min(default, deadline.remaining())
+
+
+def bounded_call(fn, *args, timeout: float = None, **kwargs):
+    """
+    Runs a blocking call that has no timeout of its own (e.g. yfinance `.info`)
+    and raises TimeoutError after `timeout` seconds (default: request_timeout()).
+    A call that times out is left to finish in the background.
+    """
+    timeout = request_timeout() if timeout is None else timeout
+    future = _POOL.submit(fn, *args, **kwargs)
+    try:
+        return future.result(timeout=timeout)
+    except TimeoutError:
+        if future.done():
+            raise  # the call's own timeout
+        raise TimeoutError(f"No response within {timeout:.3g}s") from None
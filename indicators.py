@@ -0,0 +1,147 @@
+import numpy as np
+import pandas as pd
+
+# Defaults match the `ta` library's indicator defaults
+RSI_WINDOW = 14
+MACD_WINDOWS = (12, 26, 9)
+SMA_WINDOWS = (20, 50)
+EMA_WINDOWS = (20, 50)
+BB_WINDOW = 20
+BB_DEV = 2.0
+ATR_WINDOW = 14
+
+
+def _as_2d(values) -> np.ndarray:
+    """(T,) or (T, N) -> C-contiguous float64 (T, N); time-major so each step reads one row."""
+    arr = np.ascontiguousarray(values, dtype=np.float64)
+    return arr[:, None] if arr.ndim == 1 else arr
+
+
+def _rolling(values: np.ndarray, window: int, with_std: bool = False):
+    """
+    Rolling mean (and population std) over axis 0, NaN until a full window is available.
+    pandas' online rolling kernels run over all columns at once without materializing
+    the (T, N, window) block a strided view would need.
+    """
+    roll = pd.DataFrame(values, copy=False).rolling(window)
+    mean = roll.mean().to_numpy()
+    return (mean, roll.std(ddof=0).to_numpy()) if with_std else mean
+
+
+def compute_indicators(close, high=None, low=None, volume=None, rsi_window: int = RSI_WINDOW,
+                       macd_windows: tuple = MACD_WINDOWS, sma_windows: tuple = SMA_WINDOWS,
+                       ema_windows: tuple = EMA_WINDOWS, bb_window: int = BB_WINDOW, bb_dev: float = BB_DEV,
+                       atr_window: int = ATR_WINDOW) -> dict:
+    """
+    RSI, MACD (+ signal / histogram), SMA and EMA sets, Bollinger bands, ATR and OBV
+    for one series (T,) or a batch (T, N) of tickers.
+
+    Every exponentially smoothed quantity (MACD EMAs, EMA set, RSI averages, MACD
+    signal, ATR) is advanced together in a single pass over time, vectorized across
+    tickers, instead of one pandas Series per indicator. Window statistics run
+    once over the whole (T, N) block. ATR and OBV are skipped when high/low/volume
+    are not given.
+    Leading NaNs (tickers with shorter history) are handled per column.
+    """
+    single = np.ndim(close) == 1
+    close = _as_2d(close)
+    T, N = close.shape
+    fast, slow, sign = macd_windows
+    out = {}
+
+    # --- Inputs to the recursive pass ---
+    prev_close = np.vstack([np.full((1, N), np.nan), close[:-1]])
+    diff = close - prev_close
+    missing = np.isnan(close)
+    # `ta` treats the first diff as 0 gain / 0 loss; rows before a ticker's history stay NaN
+    up = np.where(missing, np.nan, np.where(diff > 0, diff, 0.0))
+    down = np.where(missing, np.nan, np.where(diff < 0, -diff, 0.0))
+
+    # Stacked EMA block: rows are (source, alpha, min_periods)
+    spans = [fast, slow] + list(ema_windows)
+    sources = [close] * len(spans) + [up, down]
+    alphas = np.array([2.0 / (s + 1) for s in spans] + [1.0 / rsi_window] * 2)[:, None]
+    min_periods = np.array(spans + [rsi_window] * 2)[:, None]
+    K = len(sources)
+
+    ema_out = np.empty((K, T, N))
+    state = np.full((K, N), np.nan)
+    count = np.zeros((K, N))
+
+    sig_out = np.empty((T, N))
+    sig_state = np.full(N, np.nan)
+    sig_count = np.zeros(N)
+    sig_alpha = 2.0 / (sign + 1)
+
+    has_range = high is not None and low is not None
+    if has_range:
+        high, low = _as_2d(high), _as_2d(low)
+        # True range; the first bar of each ticker has no previous close, so it is high - low
+        true_range = np.fmax(high - low, np.fmax(np.abs(high - prev_close), np.abs(low - prev_close)))
+        atr_out = np.full((T, N), np.nan)
+        atr_state = np.zeros(N)
+        atr_count = np.zeros(N)
+
+    # --- Single fused pass over time ---
+    for t in range(T):
+        x = np.stack([s[t] for s in sources])
+        valid = ~np.isnan(x)
+        start = valid & (count == 0)
+        state = np.where(start, x, np.where(valid, state + alphas * (x - state), state))
+        count += valid
+        ema_out[:, t] = np.where(count >= min_periods, state, np.nan)
+
+        macd_t = ema_out[0, t] - ema_out[1, t]
+        m_valid = ~np.isnan(macd_t)
+        sig_state = np.where(m_valid & (sig_count == 0), macd_t,
+                             np.where(m_valid, sig_state + sig_alpha * (macd_t - sig_state), sig_state))
+        sig_count += m_valid
+        sig_out[t] = np.where(sig_count >= sign, sig_state, np.nan)
+
+        if has_range:
+            tr = true_range[t]
+            tr_valid = ~np.isnan(tr)
+            atr_count += tr_valid
+            # Seed with the simple mean of the first window, then Wilder smoothing
+            seeding = tr_valid & (atr_count <= atr_window)
+            atr_state = np.where(seeding, atr_state + tr / atr_window,
+                                 np.where(tr_valid, atr_state + (tr - atr_state) / atr_window, atr_state))
+            atr_out[t] = np.where(atr_count >= atr_window, atr_state, np.nan)
+
+    # --- Assemble outputs (in place over the EMA block where possible) ---
+    del up, down, sources
+    macd = ema_out[0]
+    macd -= ema_out[1]
+    out["macd"] = macd
+    out["macd_signal"] = sig_out
+    out["macd_diff"] = macd - sig_out
+    for i, w in enumerate(ema_windows):
+        out[f"ema_{w}"] = ema_out[2 + i]
+
+    rsi, avg_down = ema_out[-2], ema_out[-1]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rsi /= avg_down
+        rsi += 1
+        np.divide(100.0, rsi, out=rsi)
+        np.subtract(100.0, rsi, out=rsi)
+    rsi[avg_down == 0] = 100.0
+    out["rsi"] = rsi
+
+    for w in sma_windows:
+        out[f"sma_{w}"] = _rolling(close, w)
+    bb_mavg, bb_std = _rolling(close, bb_window, with_std=True)
+    out["bb_mavg"] = bb_mavg
+    out["bb_hband"] = bb_mavg + bb_dev * bb_std
+    out["bb_lband"] = bb_mavg - bb_dev * bb_std
+
+    if has_range:
+        out["atr"] = atr_out
+    if volume is not None:
+        volume = _as_2d(volume)
+        signed = np.where(diff < 0, -volume, volume)
+        # Like every other indicator, NaN on rows without a close (e.g. before a ticker's history)
+        out["obv"] = np.where(missing, np.nan, np.nancumsum(signed, axis=0))
+
+    if single:
+        return {name: values[:, 0] for name, values in out.items()}
+    return out
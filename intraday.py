@@ -0,0 +1,291 @@
+import os
+import re
+import tempfile
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+import pandas as pd
+import ta
+import yfinance as yf
+
+DEFAULT_ROOT = os.path.join("data", "intraday")
+
+# Intervals fetched from Yahoo, and how far back Yahoo serves each one
+SOURCE_INTERVALS = {"1m": 60, "5m": 300, "15m": 900}
+MAX_LOOKBACK_DAYS = {"1m": 7, "5m": 60, "15m": 60}
+# How much history the local store keeps per interval
+RETENTION_DAYS = {"1m": 30, "5m": 180, "15m": 365}
+
+# --- US equity sessions (exchange local time, seconds after midnight) ---
+SESSION_TZ = "America/New_York"
+PRE_OPEN = 4 * 3600
+REGULAR_OPEN = 9 * 3600 + 30 * 60
+REGULAR_CLOSE = 16 * 3600
+POST_CLOSE = 20 * 3600
+# Bars are bucketed from the start of their own segment, so no bar spans the open or the close
+SEGMENT_ANCHORS = np.array([PRE_OPEN, REGULAR_OPEN, REGULAR_CLOSE])
+
+_INT32_MAX = np.iinfo(np.int32).max
+
+
+def _price_scale(max_price: float) -> int:
+    """Largest power-of-ten scale (up to 1/100 cent) that keeps prices inside int32."""
+    for decimals in (4, 3, 2, 1, 0):
+        if max_price * 10 ** decimals < _INT32_MAX:
+            return 10 ** decimals
+    raise ValueError(f"Price {max_price} too large for int32 storage")
+
+
+def rule_seconds(rule) -> int:
+    """'1m', '5m', '30m', '1h', '4h', '1d' (one bar per session segment) or plain seconds."""
+    if isinstance(rule, (int, np.integer)):
+        return int(rule)
+    match = re.fullmatch(r"(\d+)\s*(m|min|h|d)", str(rule).strip().lower())
+    if not match:
+        raise ValueError(f"Unknown bar size: {rule}")
+    n, unit = int(match.group(1)), match.group(2)
+    if unit == "d":
+        if n != 1:
+            raise ValueError("Only 1d session bars are supported")
+        return 86400
+    return n * (3600 if unit == "h" else 60)
+
+
+class IntradayBars:
+    """
+    Compact OHLCV bars: timestamps as a UTC epoch start plus uint32 second deltas,
+    prices as int32 scaled by `scale`, volume as int64 -- 28 bytes a bar against
+    ~48 for a float64 DataFrame, and the deltas compress to almost nothing on disk.
+    """
+
+    def __init__(self, start: int, deltas: np.ndarray, ohlc: np.ndarray, volume: np.ndarray, scale: int):
+        self.start = int(start)
+        self.deltas = deltas
+        self.ohlc = ohlc
+        self.volume = volume
+        self.scale = int(scale)
+
+    def __len__(self):
+        return len(self.deltas)
+
+    @property
+    def nbytes(self) -> int:
+        return self.deltas.nbytes + self.ohlc.nbytes + self.volume.nbytes
+
+    def timestamps(self) -> np.ndarray:
+        """UTC epoch seconds (int64)."""
+        return self.start + np.cumsum(self.deltas, dtype=np.int64)
+
+    @classmethod
+    def empty(cls) -> "IntradayBars":
+        return cls(0, np.zeros(0, np.uint32), np.zeros((0, 4), np.int32), np.zeros(0, np.int64), 1)
+
+    @classmethod
+    def from_arrays(cls, ts: np.ndarray, ohlc: np.ndarray, volume: np.ndarray, scale: int) -> "IntradayBars":
+        """Encodes sorted epoch seconds and already-scaled integer prices."""
+        if len(ts) == 0:
+            return cls.empty()
+        ts = np.asarray(ts, dtype=np.int64)
+        deltas = np.diff(ts, prepend=ts[0]).astype(np.uint32)
+        return cls(ts[0], deltas, np.asarray(ohlc, dtype=np.int32), np.asarray(volume, dtype=np.int64), scale)
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame) -> "IntradayBars":
+        """Encodes yfinance-style OHLCV (tz-aware or UTC-naive index); rows without a close are dropped."""
+        df = df[~df.index.duplicated(keep="last")].dropna(subset=["Close"]).sort_index()
+        if df.empty:
+            return cls.empty()
+        index = df.index.tz_convert("UTC") if df.index.tz is not None else df.index
+        ts = index.as_unit("s").asi8
+        prices = df[["Open", "High", "Low", "Close"]].to_numpy(dtype=np.float64)
+        scale = _price_scale(np.nanmax(prices))
+        ohlc = np.rint(prices * scale).astype(np.int32)
+        volume = df["Volume"].fillna(0).to_numpy(dtype=np.int64)
+        return cls.from_arrays(ts, ohlc, volume, scale)
+
+    def to_frame(self, tz: str = SESSION_TZ) -> pd.DataFrame:
+        """Decodes to an OHLCV DataFrame indexed in exchange time, like yfinance `history()`."""
+        index = pd.to_datetime(self.timestamps(), unit="s", utc=True).tz_convert(tz)
+        df = pd.DataFrame(self.ohlc / self.scale, index=index, columns=["Open", "High", "Low", "Close"])
+        df["Volume"] = self.volume
+        return df
+
+    def merge(self, newer: "IntradayBars") -> "IntradayBars":
+        """Union by timestamp; on overlap the newer bar wins (the live bar keeps updating)."""
+        if not len(self):
+            return newer
+        if not len(newer):
+            return self
+        scale = min(self.scale, newer.scale)
+        ts = np.concatenate([self.timestamps(), newer.timestamps()])
+        ohlc = np.concatenate([self._rescaled(scale), newer._rescaled(scale)])
+        volume = np.concatenate([self.volume, newer.volume])
+        # Stable sort keeps arrival order, so the last occurrence of a timestamp is the newest
+        order = np.argsort(ts, kind="stable")
+        ts, ohlc, volume = ts[order], ohlc[order], volume[order]
+        keep = np.append(ts[1:] != ts[:-1], True)
+        return IntradayBars.from_arrays(ts[keep], ohlc[keep], volume[keep], scale)
+
+    def _rescaled(self, scale: int) -> np.ndarray:
+        if scale == self.scale:
+            return self.ohlc
+        return np.rint(self.ohlc * (scale / self.scale)).astype(np.int32)
+
+    def since(self, epoch: int) -> "IntradayBars":
+        ts = self.timestamps()
+        keep = ts >= epoch
+        return IntradayBars.from_arrays(ts[keep], self.ohlc[keep], self.volume[keep], self.scale)
+
+
+# --- Session handling ---
+
+def session_fields(ts: np.ndarray, tz: str = SESSION_TZ):
+    """
+    Per bar: local calendar day number, seconds after local midnight and session
+    segment (0 pre-market, 1 regular, 2 after-hours, -1 outside any session).
+    DST is handled by converting through the exchange time zone.
+    """
+    local = pd.to_datetime(ts, unit="s", utc=True).tz_convert(tz).tz_localize(None).as_unit("s").asi8
+    day, sod = np.divmod(local, 86400)
+    segment = np.full(len(ts), -1, dtype=np.int8)
+    segment[(sod >= PRE_OPEN) & (sod < REGULAR_OPEN)] = 0
+    segment[(sod >= REGULAR_OPEN) & (sod < REGULAR_CLOSE)] = 1
+    segment[(sod >= REGULAR_CLOSE) & (sod < POST_CLOSE)] = 2
+    return day, sod, segment
+
+
+# --- Resampling engine ---
+
+def resample(bars: IntradayBars, rule, regular_only: bool = True) -> IntradayBars:
+    """
+    Aggregates to any coarser bar size without leaving integer space. Buckets are
+    anchored at the start of each session segment (9:30 for the regular session),
+    so a 1h bar is 9:30-10:30 and nothing straddles the open, the close or a
+    night. '1d' gives one bar per session (per segment with extended hours).
+    Labels are bucket starts. One sorted pass with ufunc.reduceat -- no pandas resample.
+    """
+    if not len(bars):
+        return bars
+    step = rule_seconds(rule)
+    ts = bars.timestamps()
+    day, sod, segment = session_fields(ts)
+
+    keep = segment == 1 if regular_only else segment >= 0
+    ts, day, sod, segment = ts[keep], day[keep], sod[keep], segment[keep]
+    ohlc, volume = bars.ohlc[keep], bars.volume[keep]
+    if not len(ts):
+        return IntradayBars.empty()
+
+    offset = sod - SEGMENT_ANCHORS[segment]
+    bucket = offset // step
+    # Monotone key: day, then segment, then bucket within the segment
+    key = (day * 3 + segment) * (86400 // min(step, 86400) + 1) + bucket
+    starts = np.flatnonzero(np.r_[True, key[1:] != key[:-1]])
+    ends = np.r_[starts[1:], len(key)] - 1
+
+    out_ohlc = np.empty((len(starts), 4), dtype=np.int32)
+    out_ohlc[:, 0] = ohlc[starts, 0]
+    out_ohlc[:, 1] = np.maximum.reduceat(ohlc[:, 1], starts)
+    out_ohlc[:, 2] = np.minimum.reduceat(ohlc[:, 2], starts)
+    out_ohlc[:, 3] = ohlc[ends, 3]
+    out_volume = np.add.reduceat(volume, starts)
+    labels = ts[starts] - (offset[starts] - bucket[starts] * step)
+    return IntradayBars.from_arrays(labels, out_ohlc, out_volume, bars.scale)
+
+
+def source_interval(rule) -> str:
+    """Coarsest stored interval that evenly divides the requested bar size."""
+    step = rule_seconds(rule)
+    for interval, seconds in sorted(SOURCE_INTERVALS.items(), key=lambda kv: -kv[1]):
+        if step % seconds == 0:
+            return interval
+    raise ValueError(f"Bar size {rule} is finer than 1m")
+
+
+# --- Local store ---
+
+class IntradayStore:
+    """
+    One compressed .npz of IntradayBars per (ticker, interval) under data/intraday/.
+    `sync` only downloads bars after the last stored one, so a 60-day 5m history
+    is fetched once and then topped up.
+    """
+
+    def __init__(self, root: str = DEFAULT_ROOT):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+
+    def _path(self, ticker: str, interval: str) -> str:
+        return os.path.join(self.root, f"{ticker.upper()}_{interval}.npz")
+
+    def load(self, ticker: str, interval: str) -> IntradayBars:
+        path = self._path(ticker, interval)
+        if not os.path.exists(path):
+            return IntradayBars.empty()
+        with np.load(path) as f:
+            return IntradayBars(int(f["start"]), f["deltas"], f["ohlc"], f["volume"], int(f["scale"]))
+
+    def save(self, ticker: str, interval: str, bars: IntradayBars):
+        path = self._path(ticker, interval)
+        # A unique temp file per writer: concurrent syncs of one ticker never interleave in the same file
+        with tempfile.NamedTemporaryFile(dir=self.root, prefix=os.path.basename(path), suffix=".tmp",
+                                         delete=False) as tmp:
+            np.savez_compressed(tmp, start=bars.start, deltas=bars.deltas, ohlc=bars.ohlc,
+                                volume=bars.volume, scale=bars.scale)
+        os.replace(tmp.name, path)
+
+    def sync(self, ticker: str, interval: str, timeout: float = None) -> IntradayBars:
+        """Fetches bars newer than the stored ones (extended hours included) and trims to retention."""
+        bars = self.load(ticker, interval)
+        now = datetime.now(timezone.utc)
+        earliest = now - timedelta(days=MAX_LOOKBACK_DAYS[interval] - 1)
+        start = earliest
+        if len(bars):
+            # Re-fetch the last stored bar: it may have been captured mid-interval
+            start = max(earliest, datetime.fromtimestamp(int(bars.timestamps()[-1]), timezone.utc))
+
+        df = yf.Ticker(ticker).history(start=start, end=now + timedelta(days=1), interval=interval,
+                                       prepost=True, timeout=timeout)
+        if not df.empty:
+            bars = bars.merge(IntradayBars.from_frame(df))
+        cutoff = int((now - timedelta(days=RETENTION_DAYS[interval])).timestamp())
+        bars = bars.since(cutoff)
+        self.save(ticker, interval, bars)
+        return bars
+
+    def bars(self, ticker: str, rule="5m", days: int = 5, regular_only: bool = True,
+             refresh: bool = True, timeout: float = None) -> pd.DataFrame:
+        """OHLCV at any bar size for the last `days` calendar days, resampled from the best stored interval."""
+        interval = source_interval(rule)
+        source = self.sync(ticker, interval, timeout) if refresh else self.load(ticker, interval)
+        cutoff = int((datetime.now(timezone.utc) - timedelta(days=days)).timestamp())
+        return resample(source.since(cutoff), rule, regular_only).to_frame()
+
+
+# --- Session snapshot for today's price action ---
+
+def session_snapshot(df: pd.DataFrame, ticker: str = None, rule: str = None) -> dict:
+    """
+    Today's price action from regular-session intraday bars: change since the open,
+    distance from session VWAP, position in the day's range and RSI on these bars
+    (computed across sessions so it is warm at the open), in the `intraday` schema.
+    """
+    if df.empty:
+        return {"ticker": ticker}
+    today = df[df.index.date == df.index[-1].date()]
+    typical = (today["High"] + today["Low"] + today["Close"]) / 3
+    volume = today["Volume"].sum()
+    vwap = (typical * today["Volume"]).sum() / volume if volume else typical.mean()
+    last, open_ = today["Close"].iloc[-1], today["Open"].iloc[0]
+    high, low = today["High"].max(), today["Low"].min()
+    rsi = ta.momentum.RSIIndicator(df["Close"]).rsi().iloc[-1]
+    return {
+        "ticker": ticker,
+        "bar": rule,
+        "last": last,
+        "chg_open_pct": (last / open_ - 1) * 100,
+        "vwap_dist_pct": (last / vwap - 1) * 100,
+        "range_pos": (last - low) / (high - low) if high > low else 0.5,
+        "rsi": rsi,
+        "bars_today": len(today),
+    }
@@ -0,0 +1,444 @@
+import math
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+from indicators import MACD_WINDOWS, RSI_WINDOW
+from intraday import IntradayStore, SESSION_TZ
+from movers import fetch_quote_snapshot
+
+DEFAULT_BAR_SECONDS = 60
+POLL_INTERVAL = 15          # Seconds between polling-feed snapshots
+CANDLE_HISTORY = 390        # Candles kept per ticker (one regular session of 1m bars)
+IDLE_TIMEOUT = 300          # Seconds without a reader after which a watch stops polling
+SMA_WINDOW = 20
+TRADING_SECONDS_PER_YEAR = 252 * 6.5 * 3600
+
+# Metrics are compared at this precision, so sub-cent noise is never pushed
+METRIC_PRECISION = {
+    "price": 2, "chg_pct": 2, "vwap": 2, "rsi": 1, "macd": 3, "macd_sig": 3,
+    "sma": 2, "vol_pct": 1, "mdd_pct": 2, "volume": 0,
+}
+
+
+# --- Quote feeds ---
+# A feed's poll() returns the ticks since the previous call as
+# [(ticker, epoch_seconds, price, volume_since_last_tick)], oldest first.
+
+class QuoteFeed(ABC):
+    @abstractmethod
+    def poll(self) -> list:
+        ...
+
+    @property
+    def exhausted(self) -> bool:
+        return False
+
+
+class PollingFeed(QuoteFeed):
+    """
+    Live quotes from one bulk Yahoo snapshot per poll for the whole watchlist.
+    Tickers whose price and volume did not move produce no tick.
+    """
+
+    def __init__(self, tickers: list, snapshot=fetch_quote_snapshot):
+        self.tickers = list(tickers)
+        self._snapshot = snapshot
+        self._last = {}  # ticker -> (price, cumulative day volume)
+
+    def poll(self) -> list:
+        snapshot = self._snapshot(self.tickers)
+        now = int(time.time())
+        ticks = []
+        for ticker, price, volume in zip(snapshot.index, snapshot["price"], snapshot["volume"]):
+            if pd.isna(price):
+                continue
+            volume = 0 if pd.isna(volume) else int(volume)
+            last = self._last.get(ticker)
+            if last == (price, volume):
+                continue
+            # Day volume is cumulative; a reset (new session) counts from zero
+            delta = volume - last[1] if last and volume >= last[1] else 0
+            self._last[ticker] = (price, volume)
+            ticks.append((ticker, now, float(price), delta))
+        return ticks
+
+
+class ReplayFeed(QuoteFeed):
+    """
+    Replays OHLCV bars as ticks on a virtual clock, `bars_per_poll` bars per poll.
+    Each bar becomes open -> low/high -> high/low -> close, with its volume on the
+    close. Deterministic, offline and as fast as the caller polls -- for testing
+    the live path against stored intraday bars or a simulated market.
+    """
+
+    def __init__(self, frames: dict, bar_seconds: int = DEFAULT_BAR_SECONDS, bars_per_poll: int = 1):
+        rows = []
+        for ticker, df in frames.items():
+            if df.empty:
+                continue
+            index = df.index.tz_convert("UTC") if df.index.tz is not None else df.index
+            ts = index.as_unit("s").asi8
+            o, h, l, c = (df[k].to_numpy(dtype=float) for k in ("Open", "High", "Low", "Close"))
+            v = df["Volume"].fillna(0).to_numpy(dtype=np.int64)
+            up = c >= o
+            first, second = np.where(up, l, h), np.where(up, h, l)
+            step = bar_seconds // 4
+            for offset, price, volume in ((0, o, 0), (step, first, 0), (2 * step, second, 0), (bar_seconds - 1, c, v)):
+                rows.append(pd.DataFrame({"ticker": ticker, "ts": ts + offset, "price": price, "volume": volume}))
+        ticks = pd.concat(rows).sort_values("ts", kind="stable") if rows else pd.DataFrame(columns=["ticker", "ts", "price", "volume"])
+        self._ticks = list(ticks.itertuples(index=False, name=None))
+        self._pos = 0
+        self.bar_seconds = bar_seconds
+        self.bars_per_poll = bars_per_poll
+        self.clock = int(ticks["ts"].iloc[0]) if len(ticks) else 0
+
+    @classmethod
+    def from_store(cls, tickers: list, rule: str = "1m", days: int = 1, bars_per_poll: int = 1, store: IntradayStore = None):
+        """Replays the locally stored intraday bars (no network when `store` is already synced)."""
+        store = store or IntradayStore()
+        frames = {t: store.bars(t, rule, days=days, refresh=False) for t in tickers}
+        return cls(frames, int(pd.Timedelta(rule.replace("m", "min")).total_seconds()), bars_per_poll)
+
+    @classmethod
+    def simulated(cls, tickers: list, bars: int = CANDLE_HISTORY, bar_seconds: int = DEFAULT_BAR_SECONDS,
+                  bars_per_poll: int = 1, seed: int = 0):
+        """Random-walk session starting at today's 9:30 open."""
+        rng = np.random.default_rng(seed)
+        start = pd.Timestamp.now(tz=SESSION_TZ).normalize() + pd.Timedelta(hours=9, minutes=30)
+        index = pd.date_range(start, periods=bars, freq=pd.Timedelta(seconds=bar_seconds))
+        frames = {}
+        for ticker in tickers:
+            close = rng.uniform(20, 500) * np.exp(np.cumsum(rng.normal(0, 0.0015, bars)))
+            open_ = np.r_[close[0], close[:-1]]
+            spread = close * rng.uniform(0, 0.001, bars)
+            frames[ticker] = pd.DataFrame({
+                "Open": open_, "High": np.maximum(open_, close) + spread, "Low": np.minimum(open_, close) - spread,
+                "Close": close, "Volume": rng.integers(1_000, 50_000, bars),
+            }, index=index)
+        return cls(frames, bar_seconds, bars_per_poll)
+
+    @property
+    def exhausted(self) -> bool:
+        return self._pos >= len(self._ticks)
+
+    def poll(self) -> list:
+        self.clock += self.bar_seconds * self.bars_per_poll
+        end = self._pos
+        while end < len(self._ticks) and self._ticks[end][1] < self.clock:
+            end += 1
+        ticks, self._pos = self._ticks[self._pos:end], end
+        return ticks
+
+
+# --- Incremental per-ticker state ---
+
+class LiveTicker:
+    """
+    Candles and indicators for one ticker, updated in O(1) per tick.
+
+    Closed candles advance the committed state (the same recursions as
+    indicators.compute_indicators, so a warmed ticker matches the batch kernel).
+    The forming candle is applied on top without mutating it, so every tick
+    gets fresh RSI / MACD / SMA / volatility values at constant cost.
+    """
+
+    def __init__(self, ticker: str, bar_seconds: int = DEFAULT_BAR_SECONDS, history: int = CANDLE_HISTORY):
+        self.ticker = ticker
+        self.bar_seconds = bar_seconds
+        # [ts, open, high, low, close, volume, version]; the last one is forming
+        self.candles = deque(maxlen=history)
+
+        fast, slow, sign = MACD_WINDOWS
+        self._spans = (fast, slow, sign)
+        self._alpha = {n: 2.0 / (n + 1) for n in (fast, slow, sign)}
+        self._n = 0                     # committed closes
+        self._last_close = None
+        self._ema = {fast: None, slow: None}
+        self._sig, self._sig_n = None, 0
+        self._avg_up = self._avg_down = None
+        self._window = deque(maxlen=SMA_WINDOW)
+        self._window_sum = 0.0
+        self._ret_n, self._ret_mean, self._ret_m2 = 0, 0.0, 0.0   # Welford over log returns
+
+        self.ref_price = None           # previous session close when known, else the first tick
+        self._peak, self._mdd = None, 0.0   # intraday drawdown, reset each session
+        self._session = None
+        self._pv = self._vol = 0.0
+
+    # -- committed (closed-candle) recursions --
+    def _commit(self, close: float):
+        fast, slow, sign = self._spans
+        for span in (fast, slow):
+            prev = self._ema[span]
+            self._ema[span] = close if prev is None else prev + self._alpha[span] * (close - prev)
+        self._n += 1
+        if self._n >= slow:
+            macd = self._ema[fast] - self._ema[slow]
+            self._sig = macd if self._sig is None else self._sig + self._alpha[sign] * (macd - self._sig)
+            self._sig_n += 1
+
+        diff = 0.0 if self._last_close is None else close - self._last_close
+        up, down = max(diff, 0.0), max(-diff, 0.0)
+        if self._avg_up is None:
+            self._avg_up, self._avg_down = up, down
+        else:
+            self._avg_up += (up - self._avg_up) / RSI_WINDOW
+            self._avg_down += (down - self._avg_down) / RSI_WINDOW
+
+        if len(self._window) == SMA_WINDOW:
+            self._window_sum -= self._window[0]
+        self._window.append(close)
+        self._window_sum += close
+
+        if self._last_close:
+            r = math.log(close / self._last_close)
+            self._ret_n += 1
+            delta = r - self._ret_mean
+            self._ret_mean += delta / self._ret_n
+            self._ret_m2 += delta * (r - self._ret_mean)
+        self._last_close = close
+
+    def warm(self, df: pd.DataFrame):
+        """Seeds the state from historical candles (e.g. IntradayStore bars) without emitting updates."""
+        if df.empty:
+            return
+        index = df.index.tz_convert("UTC") if df.index.tz is not None else df.index
+        for ts, o, h, l, c, v in zip(index.as_unit("s").asi8, df["Open"], df["High"], df["Low"], df["Close"], df["Volume"]):
+            if self.candles:
+                self._commit(self.candles[-1][4])
+            self.candles.append([int(ts), o, h, l, c, int(v), 0])
+        local = df.index.tz_convert(SESSION_TZ) if df.index.tz is not None else df.index
+        last_session = local.date == local[-1].date()
+        earlier = df["Close"][~last_session]
+        self.ref_price = float(earlier.iloc[-1]) if len(earlier) else float(df["Open"].iloc[0])
+
+        # VWAP and drawdown pick up the last session where the history leaves off
+        today = df[last_session]
+        self._session = local[-1].date()
+        self._pv = float(((today["High"] + today["Low"] + today["Close"]) / 3 * today["Volume"]).sum())
+        self._vol = float(today["Volume"].sum())
+        self._peak = float(today["High"].max())
+        self._mdd = float(min((today["Close"] / today["Close"].cummax() - 1).min(), 0.0))
+
+    def on_tick(self, ts: int, price: float, volume: int, version: int) -> bool:
+        """Applies one tick; False if it is older than the forming candle."""
+        bucket = ts - ts % self.bar_seconds
+        if self.candles and bucket < self.candles[-1][0]:
+            return False
+        if self.candles and bucket == self.candles[-1][0]:
+            candle = self.candles[-1]
+            candle[2], candle[3], candle[4] = max(candle[2], price), min(candle[3], price), price
+            candle[5] += volume
+            candle[6] = version
+        else:
+            if self.candles:
+                self._commit(self.candles[-1][4])  # the forming candle just closed
+            self.candles.append([bucket, price, price, price, price, volume, version])
+
+        if self.ref_price is None:
+            self.ref_price = price
+        session = pd.Timestamp(ts, unit="s", tz="UTC").tz_convert(SESSION_TZ).date()
+        if session != self._session:
+            if self._session is not None:
+                self.ref_price = self._last_close  # the previous session's close
+            self._session, self._pv, self._vol = session, 0.0, 0.0
+            self._peak, self._mdd = None, 0.0
+        self._peak = price if self._peak is None else max(self._peak, price)
+        self._mdd = min(self._mdd, price / self._peak - 1)
+        self._pv += price * volume
+        self._vol += volume
+        return True
+
+    # -- provisional view (committed state + forming candle) --
+    def metrics(self) -> dict:
+        if not self.candles:
+            return {}
+        fast, slow, sign = self._spans
+        price = self.candles[-1][4]
+        n = self._n + 1
+
+        ema = {s: price if self._ema[s] is None else self._ema[s] + self._alpha[s] * (price - self._ema[s]) for s in (fast, slow)}
+        macd = ema[fast] - ema[slow] if n >= slow else None
+        sig = None
+        if macd is not None:
+            sig = macd if self._sig is None else self._sig + self._alpha[sign] * (macd - self._sig)
+            sig = sig if self._sig_n + 1 >= sign else None
+
+        diff = 0.0 if self._last_close is None else price - self._last_close
+        up, down = max(diff, 0.0), max(-diff, 0.0)
+        avg_up = up if self._avg_up is None else self._avg_up + (up - self._avg_up) / RSI_WINDOW
+        avg_down = down if self._avg_down is None else self._avg_down + (down - self._avg_down) / RSI_WINDOW
+        rsi = None
+        if n >= RSI_WINDOW:
+            rsi = 100.0 if avg_down == 0 else 100 - 100 / (1 + avg_up / avg_down)
+
+        sma = None
+        if len(self._window) + 1 >= SMA_WINDOW:
+            dropped = self._window[0] if len(self._window) == SMA_WINDOW else 0.0
+            sma = (self._window_sum - dropped + price) / SMA_WINDOW
+
+        vol_pct = None
+        if self._last_close:
+            r = math.log(price / self._last_close)
+            k = self._ret_n + 1
+            delta = r - self._ret_mean
+            mean = self._ret_mean + delta / k
+            m2 = self._ret_m2 + delta * (r - mean)
+            if k > 1:
+                vol_pct = math.sqrt(m2 / (k - 1)) * math.sqrt(TRADING_SECONDS_PER_YEAR / self.bar_seconds) * 100
+
+        return {
+            "price": price,
+            "chg_pct": (price / self.ref_price - 1) * 100 if self.ref_price else None,
+            "vwap": self._pv / self._vol if self._vol else None,
+            "rsi": rsi,
+            "macd": macd,
+            "macd_sig": sig,
+            "sma": sma,
+            "vol_pct": vol_pct,
+            "mdd_pct": self._mdd * 100,
+            "volume": self._vol,
+        }
+
+
+# --- Watchlist engine ---
+
+class LiveWatch:
+    """
+    Drives a watchlist from a QuoteFeed. Every step bumps a version; metrics
+    and candles remember the version they last changed at, so each page keeps
+    a cursor and `updates(cursor)` returns only what changed since -- usually a
+    few metrics and the newest candle per active ticker.
+
+        watch = LiveWatch(PollingFeed(tickers), tickers)
+        watch.warm()
+        watch.start()
+        version, changes = watch.updates(cursor)
+        watch.stop()
+
+    The polling thread also stops by itself once nobody has read the watch
+    for `idle_timeout` seconds; `running` tells a cache to build a new one.
+    """
+
+    def __init__(self, feed: QuoteFeed, tickers: list, bar_seconds: int = DEFAULT_BAR_SECONDS):
+        self.feed = feed
+        self.bar_seconds = bar_seconds
+        self.tickers = {t: LiveTicker(t, bar_seconds) for t in tickers}
+        self.version = 0
+        self._metrics = {t: {} for t in tickers}
+        self._metric_versions = {t: {} for t in tickers}
+        self._lock = threading.Lock()
+        self.stop_event = threading.Event()
+        self._thread = None
+        self.last_read = time.monotonic()
+
+    def warm(self, days: int = 2, store: IntradayStore = None):
+        """Seeds every ticker from stored intraday candles so indicators are valid from the first tick."""
+        store = store or IntradayStore()
+        rule = f"{self.bar_seconds // 60}m"
+        for ticker, state in self.tickers.items():
+            try:
+                state.warm(store.bars(ticker, rule, days=days))
+            except Exception:
+                pass
+        with self._lock:
+            for ticker in self.tickers:
+                self._refresh(ticker)
+
+    def _refresh(self, ticker: str) -> bool:
+        """Re-rounds a ticker's metrics and stamps the ones that changed with the current version."""
+        changed = False
+        current, versions = self._metrics[ticker], self._metric_versions[ticker]
+        for key, value in self.tickers[ticker].metrics().items():
+            if value is not None:
+                value = round(value, METRIC_PRECISION[key])
+            if current.get(key, "unset") != value:
+                current[key], versions[key] = value, self.version
+                changed = True
+        return changed
+
+    def step(self) -> int:
+        """Consumes one poll of the feed; returns how many tickers changed."""
+        ticks = self.feed.poll()
+        if not ticks:
+            return 0
+        with self._lock:
+            self.version += 1
+            touched = set()
+            for ticker, ts, price, volume in ticks:
+                state = self.tickers.get(ticker)
+                if state and state.on_tick(int(ts), float(price), int(volume), self.version):
+                    touched.add(ticker)
+            return sum(self._refresh(t) for t in touched)
+
+    def start(self, interval: float = POLL_INTERVAL, idle_timeout: float = IDLE_TIMEOUT) -> "LiveWatch":
+        """Starts the shared polling thread (once); stopped by `stop()` or after `idle_timeout` without readers."""
+        if self._thread is None:
+            self.last_read = time.monotonic()
+            self._thread = threading.Thread(target=self.run_forever, args=(self.stop_event, interval, idle_timeout),
+                                            daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self.stop_event.set()
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive() and not self.stop_event.is_set()
+
+    def run_forever(self, stop_event: threading.Event, interval: float = POLL_INTERVAL, idle_timeout: float = None):
+        """Background loop for a single shared watch thread."""
+        while not stop_event.is_set() and not self.feed.exhausted:
+            if idle_timeout is not None and time.monotonic() - self.last_read > idle_timeout:
+                break
+            try:
+                self.step()
+            except Exception:
+                pass  # a failed poll is retried on the next interval
+            stop_event.wait(interval)
+
+    def updates(self, since: int = 0):
+        """
+        (version, {ticker: {"metrics": {changed metrics}, "candles": [changed candles]}})
+        for everything stamped after `since`. Pass the returned version next time.
+        """
+        self.last_read = time.monotonic()
+        with self._lock:
+            changes = {}
+            for ticker, state in self.tickers.items():
+                metrics = {k: self._metrics[ticker][k] for k, v in self._metric_versions[ticker].items() if v > since}
+                candles = []
+                for candle in reversed(state.candles):
+                    if candle[6] <= since:
+                        break
+                    candles.append(tuple(candle[:6]))
+                if metrics or candles:
+                    changes[ticker] = {"metrics": metrics, "candles": candles[::-1]}
+            return self.version, changes
+
+    def snapshot(self) -> pd.DataFrame:
+        """Current metrics for every ticker (for a page's first render)."""
+        self.last_read = time.monotonic()
+        with self._lock:
+            return pd.DataFrame.from_dict({t: dict(m) for t, m in self._metrics.items()}, orient="index")
+
+    def candle_rows(self, ticker: str) -> list:
+        """[(ts, o, h, l, c, v)] -- the same rows `updates` sends, for a chart's first render."""
+        with self._lock:
+            return [tuple(c[:6]) for c in self.tickers[ticker].candles]
+
+    def candles(self, ticker: str) -> pd.DataFrame:
+        return candles_frame(self.candle_rows(ticker))
+
+
+def candles_frame(rows: list) -> pd.DataFrame:
+    """[(ts, o, h, l, c, v)] -> OHLCV DataFrame in exchange time."""
+    df = pd.DataFrame(rows, columns=["ts", "Open", "High", "Low", "Close", "Volume"])
+    df.index = pd.to_datetime(df.pop("ts"), unit="s", utc=True).dt.tz_convert(SESSION_TZ)
+    return df
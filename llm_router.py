@@ -0,0 +1,223 @@
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout, FIRST_COMPLETED, wait
+
+from crewai import LLM
+from crewai.llms.base_llm import BaseLLM
+
+from deadline import DeadlineExceeded, check_deadline, current_deadline
+
+# --- ROUTING TABLE ---
+# Analysts mostly restate tool numbers, so they get a lighter model and a short
+# output cap; the Portfolio Manager does the real synthesis.
+MODEL_ROUTES = {
+    "Senior Sentiment Analyst": {"model": "gemini/gemini-2.5-flash-lite", "fallback": "gemini/gemini-2.5-flash", "temperature": 0.1, "max_tokens": 600, "deadline": 20},
+    "Fundamental Analyst": {"model": "gemini/gemini-2.5-flash-lite", "fallback": "gemini/gemini-2.5-flash", "temperature": 0.1, "max_tokens": 600, "deadline": 20},
+    "Technical Analyst": {"model": "gemini/gemini-2.5-flash-lite", "fallback": "gemini/gemini-2.5-flash", "temperature": 0.1, "max_tokens": 600, "deadline": 20},
+    "Market Strategist": {"model": "gemini/gemini-2.5-flash", "fallback": "gemini/gemini-2.5-flash-lite", "temperature": 0.2, "max_tokens": 1200, "deadline": 40},
+    "Portfolio Manager": {"model": "gemini/gemini-2.5-flash", "fallback": "gemini/gemini-2.5-flash-lite", "temperature": 0.2, "max_tokens": 2000, "deadline": 45},
+}
+DEFAULT_ROUTE = {"model": "gemini/gemini-2.5-flash", "fallback": "gemini/gemini-2.5-flash-lite", "temperature": 0.2, "max_tokens": 1500, "deadline": 30}
+
+# A model whose recent error rate exceeds this is skipped in favour of its fallback
+MAX_ERROR_RATE = 0.5
+# Smoothing factor for the latency / error moving averages
+EWMA_ALPHA = 0.3
+# A model skipped as unhealthy gets one probe call once it has seen no traffic for this long
+HEALTH_COOLDOWN = 60.0
+# Calls kept in a router's shared log; each run keeps its own complete log
+ROUTER_LOG_SIZE = 500
+
+_POOL = ThreadPoolExecutor(max_workers=8, thread_name_prefix="llm-router")
+
+
+class ModelStats:
+    """
+    Thread-safe moving averages of latency and error rate per model. An
+    unhealthy model receives no traffic, so its averages would never improve;
+    after HEALTH_COOLDOWN it is reported healthy once to let a call probe it.
+    """
+
+    def __init__(self, cooldown: float = HEALTH_COOLDOWN):
+        self._lock = threading.Lock()
+        self.cooldown = cooldown
+        self.latency = {}
+        self.error_rate = {}
+        self.observed_at = {}
+
+    def observe(self, model: str, latency: float, ok: bool):
+        with self._lock:
+            prev = self.latency.get(model, latency)
+            self.latency[model] = (1 - EWMA_ALPHA) * prev + EWMA_ALPHA * latency
+            prev_err = self.error_rate.get(model, 0.0)
+            self.error_rate[model] = (1 - EWMA_ALPHA) * prev_err + EWMA_ALPHA * (0.0 if ok else 1.0)
+            self.observed_at[model] = time.monotonic()
+
+    def healthy(self, model: str, deadline: float) -> bool:
+        with self._lock:
+            if (self.error_rate.get(model, 0.0) <= MAX_ERROR_RATE
+                    and self.latency.get(model, 0.0) <= deadline):
+                return True
+            now = time.monotonic()
+            if now - self.observed_at.get(model, now) >= self.cooldown:
+                # Claim the probe so concurrent callers keep using the fallback
+                self.observed_at[model] = now
+                return True
+            return False
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {m: {"latency_s": round(self.latency[m], 2), "error_rate": round(self.error_rate.get(m, 0.0), 2)}
+                    for m in self.latency}
+
+
+class RoutedLLM(BaseLLM):
+    """
+    Calls the role's preferred model and hedges to the fallback when the call
+    misses its deadline or fails. Which model answered is appended to `log`,
+    and to `run_log` when the call belongs to a run that reports its own routing.
+    """
+
+    def __init__(self, role: str, primary, fallback, deadline: float, stats: ModelStats, log, run_log: list = None):
+        super().__init__(model=primary.model, temperature=getattr(primary, "temperature", None))
+        self.role = role
+        self.primary = primary
+        self.fallback = fallback
+        self.deadline = deadline
+        self.stats = stats
+        self.log = log
+        self.run_log = run_log
+
+    def _timed_call(self, llm, messages, *args, **kwargs):
+        started = time.monotonic()
+        try:
+            result = llm.call(messages, *args, **kwargs)
+        except Exception:
+            self.stats.observe(llm.model, time.monotonic() - started, ok=False)
+            raise
+        self.stats.observe(llm.model, time.monotonic() - started, ok=True)
+        return result
+
+    def _record(self, llm, started, hedged):
+        entry = {
+            "role": self.role,
+            "model": llm.model,
+            "latency_s": round(time.monotonic() - started, 2),
+            "hedged": hedged,
+        }
+        self.log.append(entry)
+        if self.run_log is not None:
+            self.run_log.append(entry)
+
+    def call(self, messages, *args, **kwargs):
+        started = time.monotonic()
+        # The run deadline (if any) caps the per-model deadline
+        check_deadline()
+        run_deadline = current_deadline()
+        timeout = self.deadline if run_deadline is None else min(self.deadline, run_deadline.remaining())
+
+        first, second = self.primary, self.fallback
+        if second is not None and not self.stats.healthy(first.model, self.deadline):
+            first, second = second, first
+
+        future = _POOL.submit(self._timed_call, first, messages, *args, **kwargs)
+        try:
+            result = future.result(timeout=timeout)
+            self._record(first, started, hedged=False)
+            return result
+        except FutureTimeout:
+            check_deadline()
+            if second is None:
+                raise
+        except Exception:
+            if second is None:
+                raise
+            result = self._timed_call(second, messages, *args, **kwargs)
+            self._record(second, started, hedged=True)
+            return result
+
+        # Deadline missed: race the slow call against the fallback, first answer wins
+        hedge = _POOL.submit(self._timed_call, second, messages, *args, **kwargs)
+        pending = {future: first, hedge: second}
+        while pending:
+            done, _ = wait(pending, timeout=run_deadline.remaining() if run_deadline else None,
+                           return_when=FIRST_COMPLETED)
+            if not done:
+                raise DeadlineExceeded("Run deadline exceeded")
+            for f in done:
+                llm = pending.pop(f)
+                if f.exception() is None:
+                    self._record(llm, started, hedged=True)
+                    return f.result()
+        return future.result()  # both failed; surface the primary's error
+
+    def supports_function_calling(self) -> bool:
+        return self.primary.supports_function_calling()
+
+    def supports_stop_words(self) -> bool:
+        return self.primary.supports_stop_words()
+
+    def get_context_window_size(self) -> int:
+        return self.primary.get_context_window_size()
+
+
+class StubLLM(BaseLLM):
+    """Offline stand-in for a model: fixed reply, optional latency and failures."""
+
+    def __init__(self, model: str = "stub/local", reply: str = "Final Answer: stub", latency: float = 0.0,
+                 fail: bool = False, temperature: float = None, **kwargs):
+        super().__init__(model=model, temperature=temperature)
+        self.reply = reply
+        self.latency = latency
+        self.fail = fail
+        self.calls = 0
+
+    def call(self, messages, *args, **kwargs):
+        self.calls += 1
+        time.sleep(self.latency)
+        if self.fail:
+            raise RuntimeError(f"{self.model} unavailable")
+        return self.reply
+
+    def supports_function_calling(self) -> bool:
+        return False
+
+    def supports_stop_words(self) -> bool:
+        return False
+
+    def get_context_window_size(self) -> int:
+        return 8192
+
+
+class ModelRouter:
+    """
+    Builds a RoutedLLM per agent role from MODEL_ROUTES. Stats persist for the
+    router's lifetime, so keep one router per process to make routing latency-aware;
+    its `log` only keeps the last ROUTER_LOG_SIZE calls across all runs.
+    `llm_factory(model, route, api_key)` can be swapped for StubLLM in offline runs.
+    """
+
+    def __init__(self, api_key: str, routes: dict = None, llm_factory=None):
+        self.api_key = api_key
+        self.routes = MODEL_ROUTES if routes is None else routes
+        self.llm_factory = llm_factory or self._gemini
+        self.stats = ModelStats()
+        self.log = deque(maxlen=ROUTER_LOG_SIZE)
+
+    @staticmethod
+    def _gemini(model, route, api_key):
+        return LLM(
+            model=model,
+            api_key=api_key,
+            temperature=route["temperature"],
+            max_tokens=route["max_tokens"],
+            verbose=True
+        )
+
+    def llm_for(self, role: str, log: list = None) -> RoutedLLM:
+        """`log` collects this run's calls, apart from other runs sharing the router."""
+        route = self.routes.get(role, DEFAULT_ROUTE)
+        primary = self.llm_factory(route["model"], route, self.api_key)
+        fallback = self.llm_factory(route["fallback"], route, self.api_key) if route.get("fallback") else None
+        return RoutedLLM(role, primary, fallback, route["deadline"], self.stats, self.log, log)
@@ -0,0 +1,234 @@
+import os
+import sqlite3
+import threading
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+import requests
+import yfinance as yf
+
+from deadline import request_timeout
+from intraday import REGULAR_CLOSE, REGULAR_OPEN, session_fields
+
+AV_URL = "https://www.alphavantage.co/query"
+DEFAULT_DB_PATH = os.path.join("data", "market.db")
+
+# Alpha Vantage free tier is 25 calls/day; leave most of it for news and the UI.
+# Polls only happen during the regular US session, so the budget spreads over it.
+MOVERS_DAILY_BUDGET = 8
+POLL_INTERVAL = timedelta(seconds=(REGULAR_CLOSE - REGULAR_OPEN) / MOVERS_DAILY_BUDGET)
+
+# Alpha Vantage response key -> list name stored in the table
+LISTS = {
+    "top_gainers": "gainers",
+    "top_losers": "losers",
+    "most_actively_traded": "actives",
+}
+
+# Shared by all recorder instances so concurrent sessions never double-poll
+_POLL_LOCK = threading.Lock()
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS movers_snapshots (
+    snapshot_ts TEXT,
+    list TEXT,
+    rank INTEGER,
+    ticker TEXT,
+    price REAL,
+    change_amount REAL,
+    change_pct REAL,
+    volume INTEGER,
+    PRIMARY KEY (snapshot_ts, list, rank)
+);
+CREATE INDEX IF NOT EXISTS idx_movers_list_ts ON movers_snapshots (list, snapshot_ts);
+CREATE TABLE IF NOT EXISTS poll_attempts (
+    attempted_at TEXT,
+    ok INTEGER
+);
+"""
+
+
+def _to_float(value):
+    return float(str(value).rstrip("%"))
+
+
+def in_regular_session(now: datetime = None) -> bool:
+    """True during the regular US session on a weekday (exchange holidays are not modeled)."""
+    epoch = int((now or datetime.now()).timestamp())
+    day, _, segment = session_fields([epoch])
+    # Local day 0 (1970-01-01) was a Thursday, so (day + 3) % 7 is 0 on Mondays
+    return segment[0] == 1 and (day[0] + 3) % 7 < 5
+
+
+class MoversRecorder:
+    """
+    Records TOP_GAINERS_LOSERS snapshots (gainers, losers and most-actives)
+    so every UI session and tool reads the latest snapshot instead of calling
+    the API. Polling happens only during the regular session and at most once
+    per POLL_INTERVAL since the last attempt, successful or not.
+    """
+
+    def __init__(self, path: str = DEFAULT_DB_PATH, poll_interval: timedelta = POLL_INTERVAL):
+        self.path = path
+        self.poll_interval = poll_interval
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+
+    def _connect(self):
+        return sqlite3.connect(self.path)
+
+    def record(self, data: dict, snapshot_ts: str = None) -> int:
+        """Stores one TOP_GAINERS_LOSERS response. Returns the number of rows written."""
+        snapshot_ts = snapshot_ts or datetime.now().isoformat(timespec="seconds")
+        rows = [
+            (snapshot_ts, name, rank, e["ticker"], _to_float(e["price"]), _to_float(e["change_amount"]),
+             _to_float(e["change_percentage"]), int(e["volume"]))
+            for key, name in LISTS.items()
+            for rank, e in enumerate(data.get(key, []))
+        ]
+        with self._connect() as conn:
+            conn.executemany("INSERT OR REPLACE INTO movers_snapshots VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+        return len(rows)
+
+    def latest_snapshot_time(self):
+        with self._connect() as conn:
+            row = conn.execute("SELECT MAX(snapshot_ts) FROM movers_snapshots").fetchone()
+        return datetime.fromisoformat(row[0]) if row[0] else None
+
+    def last_attempt_time(self):
+        with self._connect() as conn:
+            row = conn.execute("SELECT MAX(attempted_at) FROM poll_attempts").fetchone()
+        return datetime.fromisoformat(row[0]) if row[0] else None
+
+    def _log_attempt(self, ok: bool):
+        with self._connect() as conn:
+            conn.execute("INSERT INTO poll_attempts VALUES (?, ?)", (datetime.now().isoformat(timespec="seconds"), int(ok)))
+
+    def poll(self, api_key: str) -> bool:
+        """Calls the API once and records the result. Returns False on rate limit/error."""
+        try:
+            data = requests.get(AV_URL, params={"function": "TOP_GAINERS_LOSERS", "apikey": api_key},
+                                timeout=request_timeout()).json()
+        except Exception:
+            data = {}
+        ok = "top_gainers" in data
+        if ok:
+            self.record(data)
+        self._log_attempt(ok)
+        return ok
+
+    def poll_if_due(self, api_key: str, now: datetime = None) -> bool:
+        """
+        Polls when the last attempt is older than the poll interval, during the
+        regular session only -- except once to seed an empty table. Failed attempts
+        count too, so a rate-limited key is not hit again on every click.
+        """
+        now = now or datetime.now()
+        with _POLL_LOCK:
+            last = self.last_attempt_time()
+            if last and now - last < self.poll_interval:
+                return False
+            if self.latest_snapshot_time() and not in_regular_session(now):
+                return False
+            return self.poll(api_key)
+
+    def run_forever(self, api_key: str, stop_event: threading.Event):
+        """Background loop for a single shared recorder thread."""
+        while not stop_event.is_set():
+            self.poll_if_due(api_key)
+            stop_event.wait(self.poll_interval.total_seconds())
+
+    def latest(self, list_name: str = "gainers", limit: int = 5) -> list:
+        """Entries from the newest snapshot, in the Alpha Vantage `top_gainers` shape."""
+        with self._connect() as conn:
+            rows = conn.execute(
+                """
+                SELECT ticker, price, change_amount, change_pct, volume FROM movers_snapshots
+                WHERE list = ? AND snapshot_ts = (SELECT MAX(snapshot_ts) FROM movers_snapshots WHERE list = ?)
+                ORDER BY rank LIMIT ?
+                """,
+                (list_name, list_name, limit),
+            ).fetchall()
+        return [
+            {"ticker": t, "price": f"{p:g}", "change_amount": f"{ca:g}",
+             "change_percentage": f"{cp:g}%", "volume": str(v)}
+            for t, p, ca, cp, v in rows
+        ]
+
+    def history(self, list_name: str = "gainers", day: str = None) -> pd.DataFrame:
+        """All snapshots of one list for a day (defaults to today)."""
+        day = day or datetime.now().date().isoformat()
+        with self._connect() as conn:
+            return pd.read_sql_query(
+                "SELECT * FROM movers_snapshots WHERE list = ? AND snapshot_ts LIKE ? ORDER BY snapshot_ts, rank",
+                conn, params=(list_name, f"{day}%"),
+            )
+
+    def membership_changes(self, list_name: str = "gainers", day: str = None) -> pd.DataFrame:
+        """Which tickers entered or left a list between consecutive snapshots of a day."""
+        df = self.history(list_name, day)
+        events = []
+        previous = set()
+        for ts, group in df.groupby("snapshot_ts", sort=True):
+            current = set(group["ticker"])
+            events += [(ts, t, "entered") for t in sorted(current - previous)]
+            events += [(ts, t, "left") for t in sorted(previous - current)]
+            previous = current
+        return pd.DataFrame(events, columns=["snapshot_ts", "ticker", "event"])
+
+
+# --- LOCAL MOVERS ENGINE (no Alpha Vantage quota) ---
+
+def fetch_quote_snapshot(tickers: list) -> pd.DataFrame:
+    """
+    Last price, previous close and volume for a whole universe from one bulk
+    Yahoo Finance download. Indexed by ticker.
+    """
+    data = yf.download(tickers, period="5d", interval="1d", progress=False, auto_adjust=False, group_by="column")
+    close = data["Close"].ffill()
+    volume = data["Volume"]
+    if isinstance(close, pd.Series):  # single ticker
+        close, volume = close.to_frame(tickers[0]), volume.to_frame(tickers[0])
+    return pd.DataFrame({
+        "price": close.iloc[-1],
+        "prev_close": close.iloc[-2],
+        "volume": volume.iloc[-1],
+    })
+
+
+def compute_movers(snapshot: pd.DataFrame, limit: int = 20, min_price: float = 1.0) -> dict:
+    """
+    Ranks a quote snapshot by percent change and volume in one vectorized pass.
+    Returns the TOP_GAINERS_LOSERS payload shape, so results can be shown by the
+    UI or stored with MoversRecorder.record().
+    """
+    df = snapshot.dropna(subset=["price", "prev_close"])
+    df = df[(df["price"] >= min_price) & (df["prev_close"] > 0)]
+
+    change = df["price"].to_numpy() - df["prev_close"].to_numpy()
+    pct = change / df["prev_close"].to_numpy() * 100
+    volume = df["volume"].fillna(0).to_numpy()
+    tickers = df.index.to_numpy()
+
+    order = np.argsort(pct)
+    by_volume = np.argsort(volume)[::-1][:limit]
+
+    def entries(idx):
+        return [
+            {"ticker": tickers[i], "price": f"{df['price'].iat[i]:.2f}", "change_amount": f"{change[i]:.4f}",
+             "change_percentage": f"{pct[i]:.4f}%", "volume": str(int(volume[i]))}
+            for i in idx
+        ]
+
+    return {
+        "top_gainers": entries(order[::-1][:limit]),
+        "top_losers": entries(order[:limit]),
+        "most_actively_traded": entries(by_volume),
+    }
+
+
+def local_market_movers(tickers: list, limit: int = 20) -> dict:
+    return compute_movers(fetch_quote_snapshot(tickers), limit=limit)
@@ -0,0 +1,223 @@
+import hashlib
+import os
+import sqlite3
+import threading
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+from movers import POLL_INTERVAL
+from sentiment import fetch_news_feed, sentiment_label
+
+DEFAULT_DB_PATH = os.path.join("data", "news.db")
+
+FEED_LIMIT = 1000       # NEWS_SENTIMENT maximum articles per call
+MAX_SYNC_PAGES = 3      # Calls one window may spend paging back through a heavily covered ticker
+MARKET_FEED_TTL = POLL_INTERVAL  # The market-wide feed is refreshed as often as the movers
+
+# Database path -> (fetched_at, feed), shared by all store instances so repeat scans reuse one call
+_MARKET_FEEDS = {}
+_MARKET_FEED_LOCK = threading.Lock()
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS articles (
+    url_hash TEXT PRIMARY KEY,
+    url TEXT,
+    title TEXT,
+    time_published TEXT,
+    overall_score REAL,
+    overall_label TEXT
+);
+CREATE TABLE IF NOT EXISTS article_tickers (
+    url_hash TEXT,
+    ticker TEXT,
+    time_published TEXT,
+    relevance REAL,
+    score REAL,
+    PRIMARY KEY (url_hash, ticker)
+);
+CREATE INDEX IF NOT EXISTS idx_ticker_time ON article_tickers (ticker, time_published);
+CREATE TABLE IF NOT EXISTS sync_state (
+    ticker TEXT PRIMARY KEY,
+    synced_from TEXT,
+    last_synced TEXT
+);
+"""
+
+
+def url_hash(url: str) -> str:
+    return hashlib.sha1(url.encode("utf-8")).hexdigest()
+
+
+def to_av_time(value) -> str:
+    """'2024-05-01' / date / datetime -> Alpha Vantage 'YYYYMMDDTHHMM'."""
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    return value.strftime("%Y%m%dT%H%M")
+
+
+class NewsStore:
+    """
+    Local, deduplicated copy of NEWS_SENTIMENT articles.
+    Articles are keyed by URL hash and indexed per ticker by publish time,
+    so any historical window can be answered without calling the API.
+    """
+
+    def __init__(self, path: str = DEFAULT_DB_PATH):
+        self.path = path
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+
+    def _connect(self):
+        return sqlite3.connect(self.path)
+
+    def add_articles(self, feed: list) -> int:
+        """Inserts new articles, ignoring ones already stored. Returns the number added."""
+        articles, mentions = [], []
+        for a in feed:
+            if not a.get("url"):
+                continue
+            key = url_hash(a["url"])
+            published = a.get("time_published")
+            articles.append((key, a["url"], a.get("title"), published,
+                             float(a.get("overall_sentiment_score", 0)), a.get("overall_sentiment_label")))
+            mentions.extend(
+                (key, ts["ticker"], published, float(ts.get("relevance_score", 0)), float(ts.get("ticker_sentiment_score", 0)))
+                for ts in a.get("ticker_sentiment", [])
+            )
+
+        with self._connect() as conn:
+            before = conn.total_changes
+            conn.executemany("INSERT OR IGNORE INTO articles VALUES (?, ?, ?, ?, ?, ?)", articles)
+            added = conn.total_changes - before
+            conn.executemany("INSERT OR IGNORE INTO article_tickers VALUES (?, ?, ?, ?, ?)", mentions)
+        return added
+
+    def market_feed(self, api_key: str, max_age: timedelta = MARKET_FEED_TTL):
+        """
+        Latest market-wide feed, fetched at most once per `max_age`. Fetched
+        articles are stored, so deep dives on the same tickers answer from them.
+        A rate-limited attempt counts too and returns None until it expires.
+        """
+        now = datetime.now()
+        with _MARKET_FEED_LOCK:
+            cached = _MARKET_FEEDS.get(self.path)
+            if cached and now - cached[0] < max_age:
+                return cached[1]
+            feed = fetch_news_feed(api_key)
+            if feed is not None:
+                self.add_articles(feed)
+            _MARKET_FEEDS[self.path] = (now, feed)
+            return feed
+
+    def sync_state(self, ticker: str):
+        """(synced_from, last_synced) of the window fetched for `ticker` itself, or None."""
+        with self._connect() as conn:
+            return conn.execute(
+                "SELECT synced_from, last_synced FROM sync_state WHERE ticker = ?", (ticker,)
+            ).fetchone()
+
+    def _set_sync_state(self, ticker: str, synced_from, last_synced):
+        with self._connect() as conn:
+            conn.execute("INSERT OR REPLACE INTO sync_state VALUES (?, ?, ?)", (ticker, synced_from, last_synced))
+
+    def _fetch_back(self, ticker: str, api_key: str, time_from=None, time_to=None):
+        """
+        Fetches [time_from, time_to] newest first, paging back with `time_to` while
+        pages come back full, for at most MAX_SYNC_PAGES calls. Returns (added,
+        published, reached): `reached` is how far back the window is complete --
+        `time_from` when it was fetched entirely, else the oldest article fetched.
+        None if rate limited before the first page.
+        """
+        added, published = 0, []
+        for _ in range(MAX_SYNC_PAGES):
+            feed = fetch_news_feed(api_key, tickers=[ticker], limit=FEED_LIMIT, time_from=time_from, time_to=time_to)
+            if feed is None:
+                if not published:
+                    return None
+                break
+            added += self.add_articles(feed)
+            page = [a["time_published"] for a in feed if a.get("time_published")]
+            published += page
+            if len(feed) < FEED_LIMIT or not page:
+                return added, published, time_from
+            time_to = min(page)[:13]
+        return added, published, min(published)[:13]
+
+    def sync(self, ticker: str, api_key: str, since=None):
+        """
+        Fetches only what is missing for `ticker`: articles newer than its last
+        sync, plus a backfill when `since` is earlier than anything synced so far.
+        Articles stored because they also mention `ticker` (e.g. from another
+        ticker's sync) do not count as synced, and a window is only recorded as
+        synced as far back as its pages actually reached. Returns the number of
+        new articles, or None if Alpha Vantage is rate limited.
+        """
+        since = to_av_time(since) if since else None
+        synced_from, last_synced = self.sync_state(ticker) or (None, None)
+        added = 0
+
+        if synced_from is not None and since and since < synced_from:
+            result = self._fetch_back(ticker, api_key, since, synced_from)
+            if result is None:
+                return None
+            added, _, synced_from = result
+            self._set_sync_state(ticker, synced_from, last_synced)
+
+        if last_synced:
+            # time_from is minute-resolution; step past the newest synced minute
+            time_from = to_av_time(datetime.strptime(last_synced[:13], "%Y%m%dT%H%M") + timedelta(minutes=1))
+        else:
+            time_from = synced_from or since
+
+        result = self._fetch_back(ticker, api_key, time_from)
+        if result is None:
+            return None
+        new, published, reached = result
+        added += new
+
+        if reached != time_from:
+            # Pages ran out before reaching the previous sync: coverage restarts at what was fetched
+            synced_from = reached
+        elif synced_from is None:
+            synced_from = since or (min(published) if published else None)
+        if published:
+            last_synced = max([last_synced or "", *published])
+        self._set_sync_state(ticker, synced_from, last_synced)
+        return added
+
+    def query(self, ticker: str, start=None, end=None) -> pd.DataFrame:
+        """Articles mentioning `ticker` published within [start, end], newest first."""
+        sql = """
+            SELECT a.url, a.title, t.time_published, t.relevance, t.score, a.overall_label
+            FROM article_tickers t JOIN articles a ON a.url_hash = t.url_hash
+            WHERE t.ticker = ?
+        """
+        params = [ticker]
+        if start:
+            sql += " AND t.time_published >= ?"
+            params.append(to_av_time(start))
+        if end:
+            # Inclusive of the whole end day
+            sql += " AND t.time_published < ?"
+            end_dt = datetime.fromisoformat(end) if isinstance(end, str) else end
+            params.append(to_av_time(end_dt + timedelta(days=1)))
+        sql += " ORDER BY t.time_published DESC"
+
+        with self._connect() as conn:
+            return pd.read_sql_query(sql, conn, params=params)
+
+    def window_sentiment(self, ticker: str, start=None, end=None) -> dict:
+        """Relevance-weighted sentiment over a window, in the sentiment tool shape."""
+        df = self.query(ticker, start, end)
+        total_relevance = df["relevance"].sum()
+        score = float((df["relevance"] * df["score"]).sum() / total_relevance) if total_relevance else 0.0
+        return {
+            "ticker": ticker,
+            "mood": sentiment_label(score),
+            "score": score,
+            "n": len(df),
+            "headlines": [[t[:80], label] for t, label in zip(df["title"][:3], df["overall_label"][:3])],
+        }
@@ -0,0 +1,125 @@
+"""
+Nightly precompute pipeline. Run after the close:
+
+    python pipeline.py                      # whole configured universe
+    python pipeline.py --tickers AAPL NVDA  # ad-hoc subset
+    python pipeline.py --movers             # also record a market-movers snapshot
+
+Refreshes prices (shared price matrix) and fundamentals, then computes
+technicals, risk metrics and screening scores into data/analytics.db.
+The tools read these rows first and only compute on a miss.
+"""
+import argparse
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import yfinance as yf
+from dotenv import load_dotenv
+
+from analytics import fundamentals_from_info
+from analytics_pool import AnalyticsExecutor
+from analytics_store import AnalyticsStore
+from movers import MoversRecorder
+from price_matrix import build_from_yahoo
+from screening import compute_screening_scores
+from universe import load_universe
+
+
+def fetch_fundamentals(ticker: str) -> dict:
+    return fundamentals_from_info(yf.Ticker(ticker).info, ticker)
+
+
+def refresh_fundamentals(tickers: list, max_workers: int = 8) -> dict:
+    """`.info` is one HTTP call per ticker, so these run on threads."""
+    def safe(ticker):
+        try:
+            return ticker, fetch_fundamentals(ticker)
+        except Exception:
+            return ticker, None
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        return {t: f for t, f in pool.map(safe, tickers) if f}
+
+
+def run_pipeline(tickers: list, period: str = "1y", workers: int = None, record_movers: bool = False) -> dict:
+    store = AnalyticsStore()
+    run_id = store.start_run(len(tickers))
+    manifest = {"universe": len(tickers), "steps": {}}
+    status = "ok"
+
+    def step(name, fn):
+        started = time.monotonic()
+        print(f"⏳ {name}...")
+        result = fn()
+        manifest["steps"][name] = {"seconds": round(time.monotonic() - started, 1)}
+        return result
+
+    try:
+        # 1. Prices -> shared memory-mapped matrix
+        matrix = step("prices", lambda: build_from_yahoo(tickers, period=period))
+        manifest["steps"]["prices"]["tickers"] = len(matrix.tickers)
+        manifest["last_bar"] = str(matrix.last_date.date()) if matrix.last_date is not None else None
+
+        # 2. Fundamentals
+        fundamentals = step("fundamentals", lambda: refresh_fundamentals(tickers))
+        store.save(run_id, "fundamentals", fundamentals)
+        manifest["steps"]["fundamentals"]["rows"] = len(fundamentals)
+
+        # 3. Technicals + risk across a process pool
+        def analytics():
+            technicals, risk, errors = {}, {}, {}
+            executor = AnalyticsExecutor(max_workers=workers)
+            for ticker, result in executor.run(matrix.tickers, on_progress=lambda d, n: print(f"   {d}/{n}", end="\r")):
+                if "error" in result:
+                    errors[ticker] = result["error"]
+                else:
+                    technicals[ticker], risk[ticker] = result["technicals"], result["risk"]
+            print()
+            return technicals, risk, errors
+
+        technicals, risk, errors = step("analytics", analytics)
+        store.save(run_id, "technicals", technicals)
+        store.save(run_id, "risk", risk)
+        manifest["steps"]["analytics"].update(rows=len(technicals), errors=len(errors))
+
+        # 4. Screening scores from the same matrix
+        scores = step("screening", lambda: compute_screening_scores(matrix.field("Close"), matrix.field("Volume")))
+        store.save(run_id, "screening", {t: row.to_dict() for t, row in scores.iterrows()})
+        manifest["steps"]["screening"]["rows"] = len(scores)
+
+        # 5. Optional movers snapshot (uses one Alpha Vantage call)
+        if record_movers:
+            api_key = os.getenv("ALPHA_VANTAGE_API_KEY")
+            manifest["steps"]["movers"] = {"recorded": bool(api_key) and MoversRecorder().poll(api_key)}
+    except Exception as e:
+        status = "failed"
+        manifest["error"] = str(e)
+        print(f"❌ Pipeline failed: {e}")
+    finally:
+        store.finish_run(run_id, status, manifest)
+
+    manifest["run_id"], manifest["status"] = run_id, status
+    return manifest
+
+
+def main():
+    load_dotenv()
+    parser = argparse.ArgumentParser(description="Precompute analytics for the configured universe.")
+    parser.add_argument("--tickers", nargs="*", help="Tickers to process (default: configured universe)")
+    parser.add_argument("--period", default="1y", help="Price history to keep in the matrix (default: 1y)")
+    parser.add_argument("--workers", type=int, default=None, help="Analytics worker processes (default: CPU count)")
+    parser.add_argument("--movers", action="store_true", help="Also record a market-movers snapshot")
+    args = parser.parse_args()
+
+    tickers = [t.upper() for t in args.tickers] if args.tickers else load_universe()
+    print(f"📡 Precomputing analytics for {len(tickers)} tickers...")
+    manifest = run_pipeline(tickers, period=args.period, workers=args.workers, record_movers=args.movers)
+    icon = "✅" if manifest["status"] == "ok" else "❌"
+    print(f"{icon} Run {manifest['run_id']} finished: {manifest['status']}")
+    for name, info in manifest["steps"].items():
+        print(f"   - {name}: {info}")
+
+
+if __name__ == "__main__":
+    main()
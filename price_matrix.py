@@ -0,0 +1,165 @@
+import json
+import os
+import shutil
+from datetime import datetime
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+import yfinance as yf
+
+DEFAULT_PATH = os.path.join("data", "prices")
+FIELDS = ["Open", "High", "Low", "Close", "Volume"]
+
+# Previous versions stay on disk so readers that resolved the pointer just before a swap can still open them
+KEEP_VERSIONS = 2
+
+
+def current_version(path: str = DEFAULT_PATH):
+    """Directory of the version the `<path>.current` pointer names, or None if nothing was written yet."""
+    try:
+        with open(path + ".current") as f:
+            name = f.read().strip()
+    except FileNotFoundError:
+        return None
+    return os.path.join(os.path.dirname(path), name)
+
+
+class PriceMatrix:
+    """
+    Read-only float32 matrix of shape (tickers, dates, fields) backed by a
+    memory-mapped .npy file plus a JSON symbol/date index. Every process that
+    opens it shares the same OS page cache, so sessions and workers add no copies.
+
+    Each write goes to its own version directory (`data.npy` + `index.json`);
+    the `<path>.current` pointer names the live one, so the data and its index
+    are always swapped together.
+    """
+
+    def __init__(self, data: np.ndarray, tickers: list, dates: pd.DatetimeIndex, fields: list = FIELDS):
+        self.data = data
+        self.tickers = list(tickers)
+        self.dates = dates
+        self.fields = list(fields)
+        self._row = {t: i for i, t in enumerate(self.tickers)}
+        self._col = {f: i for i, f in enumerate(self.fields)}
+
+    @classmethod
+    def open(cls, path: str = DEFAULT_PATH) -> "PriceMatrix":
+        version_dir = current_version(path)
+        if version_dir is None:
+            raise FileNotFoundError(f"No price matrix at {path}")
+        return cls.open_version(version_dir)
+
+    @classmethod
+    def open_version(cls, version_dir: str) -> "PriceMatrix":
+        with open(os.path.join(version_dir, "index.json")) as f:
+            index = json.load(f)
+        data = np.load(os.path.join(version_dir, "data.npy"), mmap_mode="r")
+        expected = (len(index["tickers"]), len(index["dates"]), len(index["fields"]))
+        if data.shape != expected:
+            raise ValueError(f"Price matrix in {version_dir} has shape {data.shape}, its index describes {expected}")
+        return cls(data, index["tickers"], pd.DatetimeIndex(index["dates"]), index["fields"])
+
+    def __contains__(self, ticker: str) -> bool:
+        return ticker in self._row
+
+    @property
+    def last_date(self):
+        return self.dates[-1] if len(self.dates) else None
+
+    def field(self, field: str, tickers: list = None) -> pd.DataFrame:
+        """date x ticker frame of one field. A view when `tickers` is None."""
+        values = self.data[:, :, self._col[field]]
+        columns = self.tickers
+        if tickers is not None:
+            values = values[[self._row[t] for t in tickers]]
+            columns = list(tickers)
+        return pd.DataFrame(values.T, index=self.dates, columns=columns, copy=False)
+
+    def frame(self, ticker: str) -> pd.DataFrame:
+        """OHLCV history of one ticker, shaped like yfinance `history()` output."""
+        df = pd.DataFrame(self.data[self._row[ticker]], index=self.dates, columns=self.fields, copy=False)
+        return df.dropna(how="all")
+
+
+def _naive(df: pd.DataFrame) -> pd.DataFrame:
+    # yfinance indexes are tz-aware per exchange; the matrix uses naive dates
+    return df.tz_localize(None) if df.index.tz is not None else df
+
+
+def _prune_versions(path: str):
+    root, prefix = os.path.dirname(path) or ".", os.path.basename(path) + ".v"
+    versions = sorted(name for name in os.listdir(root) if name.startswith(prefix))
+    for name in versions[:-KEEP_VERSIONS]:
+        shutil.rmtree(os.path.join(root, name), ignore_errors=True)
+
+
+def write_price_matrix(frames: dict, path: str = DEFAULT_PATH) -> PriceMatrix:
+    """
+    Builds the matrix from {ticker: OHLCV DataFrame}, aligned on the union of dates
+    (missing bars are NaN). Written to a new version directory and published by
+    atomically replacing the pointer, so readers never map a half-written file
+    or pair the data with another version's index.
+    """
+    frames = {t: _naive(df) for t, df in frames.items() if df is not None and not df.empty}
+    tickers = sorted(frames)
+    dates = pd.DatetimeIndex(sorted(set().union(*(frames[t].index for t in tickers))))
+    version = f"{os.path.basename(path)}.v{datetime.now():%Y%m%dT%H%M%S%f}"
+    version_dir = os.path.join(os.path.dirname(path), version)
+    os.makedirs(version_dir)
+
+    data = np.lib.format.open_memmap(os.path.join(version_dir, "data.npy"), mode="w+", dtype=np.float32,
+                                     shape=(len(tickers), len(dates), len(FIELDS)))
+    for i, t in enumerate(tickers):
+        data[i] = frames[t].reindex(dates)[FIELDS].to_numpy(dtype=np.float32)
+    data.flush()
+    del data
+    with open(os.path.join(version_dir, "index.json"), "w") as f:
+        json.dump({"tickers": tickers, "dates": [d.isoformat() for d in dates], "fields": FIELDS}, f)
+
+    tmp_pointer = f"{path}.current.{os.getpid()}.tmp"
+    with open(tmp_pointer, "w") as f:
+        f.write(version)
+    os.replace(tmp_pointer, path + ".current")
+    _prune_versions(path)
+    return PriceMatrix.open_version(version_dir)
+
+
+def build_from_yahoo(tickers: list, period: str = "1y", path: str = DEFAULT_PATH) -> PriceMatrix:
+    """Downloads daily OHLCV for the universe in one call and writes the matrix."""
+    data = yf.download(tickers, period=period, interval="1d", progress=False, group_by="ticker", auto_adjust=True)
+    if len(tickers) == 1:
+        frames = {tickers[0]: data.droplevel(0, axis=1) if isinstance(data.columns, pd.MultiIndex) else data}
+    else:
+        frames = {t: data[t].dropna(how="all") for t in tickers if t in data.columns.get_level_values(0)}
+    return write_price_matrix(frames, path)
+
+
+def last_completed_session(now: datetime = None) -> pd.Timestamp:
+    """The latest weekday whose daily bar a nightly run could have written by `now` (holidays are not modeled)."""
+    return pd.Timestamp(now or datetime.now()).normalize() - pd.offsets.BDay(1)
+
+
+@lru_cache(maxsize=4)
+def _open_cached(version_dir: str) -> PriceMatrix:
+    # Version directories are never rewritten, so the directory name is the cache key
+    return PriceMatrix.open_version(version_dir)
+
+
+def load_shared_matrix(path: str = DEFAULT_PATH, max_lag_sessions: int = 1):
+    """
+    The process-wide mapping of the matrix, re-opened when a new version is published.
+    Returns None if there is no matrix or its last bar is more than `max_lag_sessions`
+    weekdays behind the last completed session (one by default, to allow for a holiday).
+    Counting sessions rather than calendar days keeps Friday's bars valid over the weekend.
+    """
+    version_dir = current_version(path)
+    if version_dir is None:
+        return None
+    matrix = _open_cached(version_dir)
+    oldest_ok = last_completed_session() - pd.offsets.BDay(max_lag_sessions)
+    if matrix.last_date is None or matrix.last_date < oldest_ok:
+        return None
+    return matrix
+
@@ -0,0 +1,253 @@
+import os
+import re
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+from datetime import datetime, timedelta
+
+import pandas as pd
+import yfinance as yf
+
+DEFAULT_DB_PATH = os.path.join("data", "reports.db")
+
+# A finished deep dive on the same ticker and window is reused for this long
+DEFAULT_REUSE_AGE = timedelta(hours=6)
+
+# Sector / industry lookups give up after this long; the tickers are retried on their next report
+PROFILE_TIMEOUT = 15
+
+# Longest first, so "STRONG BUY" is not read as "BUY"
+CALLS = ["STRONG BUY", "STRONG SELL", "PROFIT-TAKE", "BUY", "SELL", "HOLD"]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS reports (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    kind TEXT,
+    ticker TEXT,
+    start_date TEXT,
+    end_date TEXT,
+    recommendation TEXT,
+    confidence INTEGER,
+    partial INTEGER,
+    created_at TEXT,
+    body TEXT
+);
+CREATE TABLE IF NOT EXISTS calls (
+    report_id INTEGER,
+    ticker TEXT,
+    call TEXT,
+    confidence INTEGER,
+    reason TEXT,
+    created_at TEXT
+);
+CREATE TABLE IF NOT EXISTS profiles (
+    ticker TEXT PRIMARY KEY,
+    sector TEXT,
+    industry TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_reports_ticker ON reports (kind, ticker, created_at);
+CREATE INDEX IF NOT EXISTS idx_calls_call ON calls (call, created_at);
+CREATE INDEX IF NOT EXISTS idx_calls_ticker ON calls (ticker, created_at);
+CREATE VIRTUAL TABLE IF NOT EXISTS reports_fts USING fts5(body, content='reports', content_rowid='id');
+CREATE TRIGGER IF NOT EXISTS reports_ai AFTER INSERT ON reports BEGIN
+    INSERT INTO reports_fts (rowid, body) VALUES (new.id, new.body);
+END;
+CREATE TRIGGER IF NOT EXISTS reports_ad AFTER DELETE ON reports BEGIN
+    INSERT INTO reports_fts (reports_fts, rowid, body) VALUES ('delete', old.id, old.body);
+END;
+"""
+
+
+# --- Field extraction (once, at write time) ---
+
+def normalize_call(text: str):
+    """'**Strong Buy** (high conviction)' -> 'STRONG BUY'; None if no call is found."""
+    upper = (text or "").upper().replace("PROFIT TAKE", "PROFIT-TAKE")
+    for call in CALLS:
+        if re.search(rf"(?<![A-Z-]){call}(?![A-Z-])", upper):
+            return call
+    return None
+
+
+def extract_report_fields(text: str) -> dict:
+    """
+    Recommendation, confidence (0-100) and partial flag of a deep-dive report.
+    Only the labelled lines the manager task pins (`**Recommendation:** X`,
+    `**Confidence Score:** N%`) are read, never a mention elsewhere in the text.
+    """
+    rec = re.search(r"(?mi)^[\s>*_]*Recommendation\s*:\s*\**\s*(.+)$", text)
+    conf = re.search(r"(?mi)^[\s>*_]*Confidence Score\s*:\s*\**\s*(\d{1,3})\s*%", text)
+    return {
+        "recommendation": normalize_call(rec.group(1)) if rec else None,
+        "confidence": min(int(conf.group(1)), 100) if conf else None,
+        "partial": "(Partial)" in text.split("\n", 1)[0],
+    }
+
+
+def extract_scanner_calls(text: str) -> list:
+    """[(ticker, call, reason)] from the `### Stock:` sections of a scanner report."""
+    calls = []
+    for block in re.split(r"(?m)^(?=###\s*Stock:)", text):
+        ticker = re.match(r"###\s*Stock:\s*\[?([A-Za-z.\-]+)", block)
+        if not ticker:
+            continue
+        signal = re.search(r"Signal:\**\s*\[?([^\]\n]*)", block)
+        reason = re.search(r"Reason:\**\s*(.*)", block)
+        calls.append((ticker.group(1).upper(), normalize_call(signal.group(1)) if signal else None,
+                      reason.group(1).strip() if reason else None))
+    return calls
+
+
+def _fetch_profile(ticker: str):
+    try:
+        info = yf.Ticker(ticker).info
+        return ticker, info.get("sector"), info.get("industry")
+    except Exception:
+        return None
+
+
+class ReportArchive:
+    """
+    Every deep-dive and scanner report, with fields extracted once at write time:
+    recommendation and confidence per report, one row per call (a deep dive has
+    one, a scan one per stock) and each ticker's sector / industry. Report text
+    is indexed with SQLite FTS5.
+
+        archive.search_calls(call="STRONG BUY", sector="semiconductor", since="2026-09-01")
+        archive.search("guidance cut", ticker="NVDA")
+    """
+
+    def __init__(self, path: str = DEFAULT_DB_PATH):
+        self.path = path
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+
+    def _connect(self):
+        return sqlite3.connect(self.path)
+
+    def _ensure_profiles(self, tickers: list, timeout: float = PROFILE_TIMEOUT):
+        """Sector / industry per ticker, looked up once and kept."""
+        if not tickers:
+            return
+        with self._connect() as conn:
+            known = {r[0] for r in conn.execute(
+                f"SELECT ticker FROM profiles WHERE ticker IN ({','.join('?' * len(tickers))})", tickers)}
+        missing = [t for t in tickers if t not in known]
+        if not missing:
+            return
+        # Looked up outside the write transaction so readers are never blocked on the network
+        pool = ThreadPoolExecutor(max_workers=8)
+        futures = [pool.submit(_fetch_profile, t) for t in missing]
+        done, _ = wait(futures, timeout=timeout)
+        pool.shutdown(wait=False, cancel_futures=True)
+        rows = [f.result() for f in done if f.result()]
+        with self._connect() as conn:
+            conn.executemany("INSERT OR REPLACE INTO profiles VALUES (?, ?, ?)", rows)
+
+    def _insert(self, kind: str, ticker, start_date, end_date, fields: dict, body: str, calls: list) -> int:
+        created_at = datetime.now().isoformat(timespec="seconds")
+        with self._connect() as conn:
+            cur = conn.execute(
+                "INSERT INTO reports (kind, ticker, start_date, end_date, recommendation, confidence, partial, created_at, body) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (kind, ticker, start_date, end_date, fields.get("recommendation"), fields.get("confidence"),
+                 int(fields.get("partial", False)), created_at, body),
+            )
+            report_id = cur.lastrowid
+            conn.executemany("INSERT INTO calls VALUES (?, ?, ?, ?, ?, ?)",
+                             [(report_id, t, call, conf, reason, created_at) for t, call, conf, reason in calls])
+        # Off the caller's thread: the report is already saved and a run's deadline does not wait on Yahoo
+        threading.Thread(target=self._ensure_profiles, args=(sorted({c[0] for c in calls}),), daemon=True).start()
+        return report_id
+
+    def add_deep_dive(self, ticker: str, start_date: str, end_date: str, body: str, partial: bool = None) -> int:
+        """`partial` (some analyst sections missing) overrides the flag read from the title line."""
+        ticker = ticker.upper()
+        fields = extract_report_fields(body)
+        if partial is not None:
+            fields["partial"] = partial
+        calls = [(ticker, fields["recommendation"], fields["confidence"], None)] if fields["recommendation"] else []
+        return self._insert("deep_dive", ticker, str(start_date), str(end_date), fields, body, calls)
+
+    def add_scan(self, body: str) -> int:
+        calls = [(t, call, None, reason) for t, call, reason in extract_scanner_calls(body)]
+        return self._insert("scanner", None, None, None, {}, body, calls)
+
+    def get(self, report_id: int):
+        with self._connect() as conn:
+            conn.row_factory = sqlite3.Row
+            row = conn.execute("SELECT * FROM reports WHERE id = ?", (report_id,)).fetchone()
+        return dict(row) if row else None
+
+    def latest(self, ticker: str, start_date: str = None, end_date: str = None,
+               max_age: timedelta = None, complete_only: bool = False):
+        """Most recent deep dive for a ticker (optionally same window / younger than `max_age`)."""
+        sql, params = "SELECT * FROM reports WHERE kind = 'deep_dive' AND ticker = ?", [ticker.upper()]
+        if start_date is not None:
+            sql += " AND start_date = ? AND end_date = ?"
+            params += [str(start_date), str(end_date)]
+        if max_age is not None:
+            sql += " AND created_at >= ?"
+            params.append((datetime.now() - max_age).isoformat(timespec="seconds"))
+        if complete_only:
+            sql += " AND partial = 0"
+        with self._connect() as conn:
+            conn.row_factory = sqlite3.Row
+            row = conn.execute(sql + " ORDER BY created_at DESC, id DESC LIMIT 1", params).fetchone()
+        return dict(row) if row else None
+
+    def reusable(self, ticker: str, start_date: str, end_date: str, max_age: timedelta = DEFAULT_REUSE_AGE):
+        """A complete report on the same ticker and window, recent enough to show instead of re-running the crew."""
+        return self.latest(ticker, start_date, end_date, max_age=max_age, complete_only=True)
+
+    def search_calls(self, call=None, ticker: str = None, sector: str = None,
+                     since: str = None, until: str = None, kind: str = None, limit: int = 200) -> pd.DataFrame:
+        """
+        Calls filtered by call ("STRONG BUY" or a list), ticker, sector (case-insensitive
+        substring of the sector or industry, e.g. "semiconductor"), date range and report kind.
+        """
+        sql = ("SELECT c.created_at, c.ticker, c.call, c.confidence, p.sector, p.industry, r.kind, c.reason, c.report_id "
+               "FROM calls c JOIN reports r ON r.id = c.report_id LEFT JOIN profiles p ON p.ticker = c.ticker WHERE 1 = 1")
+        params = []
+        if call:
+            calls = [call] if isinstance(call, str) else list(call)
+            sql += f" AND c.call IN ({','.join('?' * len(calls))})"
+            params += [normalize_call(c) or c.upper() for c in calls]
+        if ticker:
+            sql += " AND c.ticker = ?"
+            params.append(ticker.upper())
+        if sector:
+            sql += " AND (p.sector LIKE ? OR p.industry LIKE ?)"
+            params += [f"%{sector}%"] * 2
+        if since:
+            sql += " AND c.created_at >= ?"
+            params.append(str(since))
+        if until:
+            sql += " AND c.created_at < ?"
+            params.append(str(until))
+        if kind:
+            sql += " AND r.kind = ?"
+            params.append(kind)
+        sql += " ORDER BY c.created_at DESC LIMIT ?"
+        params.append(limit)
+        with self._connect() as conn:
+            return pd.read_sql_query(sql, conn, params=params)
+
+    def search(self, query: str, ticker: str = None, since: str = None, limit: int = 50) -> pd.DataFrame:
+        """Full-text search over report bodies (FTS5 syntax: phrases, prefix*, AND / OR / NOT), best match first."""
+        sql = ("SELECT r.id, r.created_at, r.kind, r.ticker, r.recommendation, r.confidence, "
+               "snippet(reports_fts, 0, '**', '**', '…', 12) AS snippet "
+               "FROM reports_fts JOIN reports r ON r.id = reports_fts.rowid WHERE reports_fts MATCH ?")
+        params = [query]
+        if ticker:
+            sql += " AND (r.ticker = ? OR r.id IN (SELECT report_id FROM calls WHERE ticker = ?))"
+            params += [ticker.upper(), ticker.upper()]
+        if since:
+            sql += " AND r.created_at >= ?"
+            params.append(str(since))
+        sql += " ORDER BY rank LIMIT ?"
+        params.append(limit)
+        with self._connect() as conn:
+            return pd.read_sql_query(sql, conn, params=params)
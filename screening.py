@@ -0,0 +1,70 @@
+import numpy as np
+import pandas as pd
+import yfinance as yf
+
+from analytics_store import AnalyticsStore
+from price_matrix import load_shared_matrix
+
+# Weights of the standardized metrics in the composite screening score
+SCORE_WEIGHTS = {
+    "momentum_20d": 0.4,
+    "return_5d": 0.3,
+    "rel_volume": 0.3,
+}
+
+
+def compute_screening_scores(close: pd.DataFrame, volume: pd.DataFrame) -> pd.DataFrame:
+    """
+    Cheap cross-sectional metrics from date x ticker close/volume frames.
+    Every metric is z-scored across tickers and blended into `score`.
+    """
+    close = close.ffill()
+    metrics = pd.DataFrame({
+        "momentum_20d": close.iloc[-1] / close.iloc[-21] - 1 if len(close) > 20 else np.nan,
+        "return_5d": close.iloc[-1] / close.iloc[-6] - 1 if len(close) > 5 else np.nan,
+        "rel_volume": volume.iloc[-1] / volume.iloc[-21:-1].mean(),
+        "volatility": close.pct_change().iloc[-20:].std() * np.sqrt(252),
+    })
+
+    cols = list(SCORE_WEIGHTS)
+    z = (metrics[cols] - metrics[cols].mean()) / metrics[cols].std(ddof=0).replace(0, np.nan)
+    metrics["score"] = (z.fillna(0) * pd.Series(SCORE_WEIGHTS)).sum(axis=1)
+    return metrics.sort_values("score", ascending=False)
+
+
+def screen_tickers(tickers: list, period: str = "3mo") -> pd.DataFrame:
+    """
+    Scores tickers from the shared price matrix when it covers them all,
+    otherwise downloads price history for all tickers in one call.
+    """
+    matrix = load_shared_matrix()
+    if matrix is not None and all(t in matrix for t in tickers):
+        return compute_screening_scores(matrix.field("Close", tickers), matrix.field("Volume", tickers))
+
+    data = yf.download(tickers, period=period, interval="1d", progress=False, group_by="column")
+    close, volume = data["Close"], data["Volume"]
+    if isinstance(close, pd.Series):  # single ticker
+        close, volume = close.to_frame(tickers[0]), volume.to_frame(tickers[0])
+    return compute_screening_scores(close, volume)
+
+
+def stored_scores(tickers: list, store: AnalyticsStore = None):
+    """Scores from the nightly pipeline when it has fresh rows for every ticker, else None."""
+    rows = (store or AnalyticsStore()).load_many(tickers, "screening")
+    if not tickers or any(t.upper() not in rows for t in tickers):
+        return None
+    return pd.DataFrame.from_dict(rows, orient="index").sort_values("score", ascending=False)
+
+
+def rank_candidates(tickers: list, top_k: int) -> list:
+    """Top-k tickers by screening score (precomputed when available); keeps the input order if scoring fails."""
+    try:
+        scores = stored_scores(tickers)
+        if scores is None:
+            scores = screen_tickers(tickers)
+        ranked = [t for t in scores.index if t in set(tickers)]
+        # Tickers Yahoo returned nothing for go last rather than disappearing
+        ranked += [t for t in tickers if t not in set(ranked)]
+        return ranked[:top_k]
+    except Exception:
+        return list(tickers)[:top_k]
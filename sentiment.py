@@ -0,0 +1,203 @@
+import numpy as np
+import pandas as pd
+import requests
+import yfinance as yf
+
+from deadline import bounded_call, request_timeout
+
+AV_URL = "https://www.alphavantage.co/query"
+
+# Same thresholds the single-ticker tool uses for its Market Mood label
+BULLISH_THRESHOLD = 0.35
+BEARISH_THRESHOLD = -0.35
+
+# Per-ticker follow-up calls a batch may spend on tickers the market-wide feed missed
+# (the free tier allows 25 calls/day in total)
+MAX_BACKFILL = 2
+
+FEED_COLUMNS = ["url", "time_published", "title", "ticker", "relevance", "score"]
+
+
+def sentiment_label(score):
+    """Maps a score (or array of scores) to Bullish / Bearish / Neutral."""
+    scores = np.asarray(score, dtype=float)
+    labels = np.select(
+        [scores >= BULLISH_THRESHOLD, scores <= BEARISH_THRESHOLD],
+        ["Bullish", "Bearish"],
+        default="Neutral",
+    )
+    return labels.item() if labels.ndim == 0 else labels
+
+
+def fetch_news_feed(api_key: str, tickers=None, limit: int = 1000, time_from=None, time_to=None):
+    """
+    Calls NEWS_SENTIMENT once and returns the raw article list.
+    Returns None when Alpha Vantage reports a rate limit.
+    """
+    params = {"function": "NEWS_SENTIMENT", "sort": "LATEST", "limit": limit, "apikey": api_key}
+    if tickers:
+        params["tickers"] = ",".join(tickers) if not isinstance(tickers, str) else tickers
+    if time_from:
+        params["time_from"] = time_from
+    if time_to:
+        params["time_to"] = time_to
+
+    data = requests.get(AV_URL, params=params, timeout=request_timeout()).json()
+    if "Information" in data or "Note" in data:
+        return None
+    return data.get("feed", [])
+
+
+def explode_feed(feed: list) -> pd.DataFrame:
+    """Flattens articles into one row per (article, mentioned ticker)."""
+    rows = [
+        (a.get("url"), a.get("time_published"), a.get("title"), ts.get("ticker"),
+         ts.get("relevance_score", 0), ts.get("ticker_sentiment_score", 0))
+        for a in feed
+        for ts in a.get("ticker_sentiment", [])
+    ]
+    df = pd.DataFrame(rows, columns=FEED_COLUMNS)
+    df[["relevance", "score"]] = df[["relevance", "score"]].astype(float)
+    return df
+
+
+def aggregate_ticker_sentiment(feed: list, tickers: list, min_relevance: float = 0.1) -> pd.DataFrame:
+    """
+    Relevance-weighted sentiment per ticker, computed in one pass over the feed.
+    Tickers without qualifying coverage get n=0 and a NaN score.
+    """
+    df = explode_feed(feed)
+    df = df[df["ticker"].isin(tickers) & (df["relevance"] >= min_relevance)]
+    df = df.drop_duplicates(["url", "ticker"])
+    df = df.assign(weighted=df["relevance"] * df["score"])
+
+    grouped = df.groupby("ticker").agg(
+        weighted=("weighted", "sum"),
+        relevance=("relevance", "sum"),
+        n=("url", "size"),
+    )
+    out = pd.DataFrame(index=pd.Index(tickers, name="ticker")).join(grouped)
+    out["n"] = out["n"].fillna(0).astype(int)
+    out["score"] = out["weighted"] / out["relevance"]
+    out["mood"] = np.where(out["n"] > 0, sentiment_label(out["score"].fillna(0)), "No Coverage")
+    return out[["mood", "score", "n"]]
+
+
+def batch_news_sentiment(tickers: list, api_key: str, max_backfill: int = MAX_BACKFILL, store=None) -> pd.DataFrame:
+    """
+    Sentiment for a whole watchlist from as few NEWS_SENTIMENT calls as possible.
+
+    Alpha Vantage treats multiple `tickers` as an AND filter, so the batch is served
+    from one market-wide LATEST feed split by `ticker_sentiment`. At most
+    `max_backfill` tickers the feed does not cover are fetched individually
+    (in watchlist order); the rest report n = 0. With a NewsStore as `store`, the
+    market-wide feed comes from its cache and every fetched article is kept.
+    Returns None if the first call is rate limited.
+    """
+    tickers = [t.upper() for t in tickers]
+    feed = store.market_feed(api_key) if store is not None else fetch_news_feed(api_key)
+    if feed is None:
+        return None
+    feed = list(feed)  # the cached feed is shared, backfills must not extend it
+
+    result = aggregate_ticker_sentiment(feed, tickers)
+    uncovered = list(result.index[result["n"] == 0])[:max_backfill]
+    if uncovered:
+        for ticker in uncovered:
+            extra = fetch_news_feed(api_key, tickers=[ticker], limit=50)
+            if extra is None:
+                break  # Out of quota, keep what we have
+            if store is not None:
+                store.add_articles(extra)
+            feed.extend(extra)
+        result = aggregate_ticker_sentiment(feed, tickers)
+    return result
+
+
+# --- LOCAL (ZERO-QUOTA) SCORER ---
+
+# Compact finance lexicon. Weights are in [-1, 1]; the normalised headline score
+# lands on the same scale as Alpha Vantage's overall_sentiment_score.
+FINANCE_LEXICON = {
+    # Bullish
+    "beat": 0.8, "beats": 0.8, "surge": 0.9, "surges": 0.9, "soar": 0.9, "soars": 0.9,
+    "jump": 0.6, "jumps": 0.6, "rally": 0.7, "rallies": 0.7, "gain": 0.5, "gains": 0.5,
+    "rise": 0.4, "rises": 0.4, "record": 0.5, "upgrade": 0.8, "upgrades": 0.8,
+    "upgraded": 0.8, "outperform": 0.7, "bullish": 0.9, "growth": 0.5, "profit": 0.5,
+    "profitable": 0.6, "strong": 0.5, "stronger": 0.5, "raises": 0.5, "raised": 0.4,
+    "buyback": 0.6, "dividend": 0.3, "approval": 0.6, "approved": 0.6, "expands": 0.4,
+    "boost": 0.6, "boosts": 0.6, "optimistic": 0.6, "exceeds": 0.7, "tops": 0.6,
+    "wins": 0.6, "breakthrough": 0.8, "rebound": 0.5, "rebounds": 0.5, "buy": 0.4,
+    # Bearish
+    "miss": -0.8, "misses": -0.8, "plunge": -0.9, "plunges": -0.9, "tumble": -0.8,
+    "tumbles": -0.8, "slump": -0.8, "slumps": -0.8, "drop": -0.5, "drops": -0.5,
+    "fall": -0.5, "falls": -0.5, "decline": -0.5, "declines": -0.5, "loss": -0.6,
+    "losses": -0.6, "downgrade": -0.8, "downgrades": -0.8, "downgraded": -0.8,
+    "underperform": -0.7, "bearish": -0.9, "weak": -0.5, "weaker": -0.5, "cuts": -0.5,
+    "cut": -0.4, "lawsuit": -0.6, "probe": -0.6, "investigation": -0.6, "recall": -0.6,
+    "fraud": -1.0, "bankruptcy": -1.0, "default": -0.8, "layoffs": -0.6, "warns": -0.7,
+    "warning": -0.6, "crash": -1.0, "selloff": -0.7, "sell": -0.4, "fears": -0.5,
+    "risk": -0.3, "halt": -0.6, "delay": -0.4, "delays": -0.4, "fine": -0.4,
+}
+NEGATORS = {"no", "not", "never", "without", "fails", "failed", "despite"}
+
+# Controls how quickly the summed weights saturate towards +/-1
+NORMALIZATION_ALPHA = 5.0
+
+
+class LocalSentimentScorer:
+    """
+    CPU-only headline scorer. Tokenisation and lexicon lookup run as pandas
+    string/explode operations, so a batch of thousands of headlines is one pass.
+    """
+
+    def __init__(self, lexicon: dict = None, alpha: float = NORMALIZATION_ALPHA):
+        self.lexicon = FINANCE_LEXICON if lexicon is None else lexicon
+        self.alpha = alpha
+
+    def score(self, headlines) -> np.ndarray:
+        """Returns one score in [-1, 1] per headline."""
+        texts = pd.Series(list(headlines), dtype="object").fillna("")
+        if texts.empty:
+            return np.zeros(0)
+
+        tokens = texts.str.lower().str.findall(r"[a-z]+").explode()
+        weights = tokens.map(self.lexicon).fillna(0.0).astype(float)
+
+        # A negator directly before a term within the same headline flips it
+        same_headline = tokens.index.to_series().shift(1).eq(tokens.index.to_series()).to_numpy()
+        negated = tokens.shift(1).isin(NEGATORS).to_numpy() & same_headline
+        weights[negated] *= -1
+
+        totals = weights.groupby(level=0).sum().reindex(texts.index, fill_value=0.0).to_numpy()
+        return totals / np.sqrt(totals * totals + self.alpha)
+
+    def summarize(self, headlines) -> dict:
+        """Aggregate mood for a set of headlines in the NEWS_SENTIMENT tool shape."""
+        headlines = list(headlines)
+        scores = self.score(headlines)
+        avg = float(scores.mean()) if len(scores) else 0.0
+        return {
+            "mood": sentiment_label(avg),
+            "score": avg,
+            "n": len(headlines),
+            "headlines": [[h[:80], sentiment_label(s)] for h, s in zip(headlines[:3], scores[:3])],
+        }
+
+
+def yahoo_headlines(ticker: str) -> list:
+    """Headlines from Yahoo Finance news, which costs no Alpha Vantage quota."""
+    titles = []
+    for item in bounded_call(lambda: yf.Ticker(ticker).news) or []:
+        # Newer yfinance nests article fields under "content"
+        title = (item.get("content") or {}).get("title") or item.get("title")
+        if title:
+            titles.append(title)
+    return titles
+
+
+def local_news_sentiment(ticker: str, scorer: LocalSentimentScorer = None) -> dict:
+    scorer = scorer or LocalSentimentScorer()
+    summary = scorer.summarize(yahoo_headlines(ticker))
+    summary["ticker"] = ticker
+    return summary
@@ -0,0 +1,79 @@
+import json
+import math
+import numbers
+
+# Rough characters-per-token ratio for Gemini on compact JSON.
+CHARS_PER_TOKEN = 4
+
+# --- PROMPT BUDGETS (tokens per tool output) ---
+# Budgets are keyed by schema, one per tool. An agent with several tools spends
+# the sum of theirs (the Technical Analyst: technicals + intraday).
+TOKEN_BUDGETS = {
+    "sentiment": 200,
+    "fundamentals": 95,
+    "technicals": 80,
+    "risk": 60,
+    "movers": 80,
+    "intraday": 80,
+}
+
+# --- OUTPUT SCHEMAS ---
+# Field order is stable and doubles as priority: trailing fields are the
+# first to go when a payload exceeds its budget.
+SCHEMAS = {
+    "sentiment": ["ticker", "mood", "score", "n", "headlines"],
+    "fundamentals": ["ticker", "price", "mcap", "pe", "sector", "beta", "price_asof"],
+    "technicals": ["ticker", "price", "rsi", "macd", "macd_sig", "sma50"],
+    "risk": ["ticker", "vol_pct", "mdd_pct"],
+    "movers": ["movers"],
+    "intraday": ["ticker", "bar", "last", "chg_open_pct", "vwap_dist_pct", "range_pos", "rsi", "bars_today"],
+}
+
+
+def estimate_tokens(text: str) -> int:
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def _round(value, precision: int):
+    """Rounds floats (incl. numpy scalars) recursively; NaN becomes null."""
+    if isinstance(value, bool) or value is None:
+        return value
+    if isinstance(value, numbers.Integral):
+        return int(value)
+    if isinstance(value, numbers.Real):
+        value = float(value)
+        return None if math.isnan(value) else round(value, precision)
+    if isinstance(value, (list, tuple)):
+        return [_round(v, precision) for v in value]
+    if isinstance(value, dict):
+        return {k: _round(v, precision) for k, v in value.items()}
+    return value
+
+
+def _dumps(record: dict) -> str:
+    return json.dumps(record, separators=(",", ":"), ensure_ascii=False)
+
+
+def compact(schema: str, payload: dict, fields=None, precision: int = 2, budget=None) -> str:
+    """
+    Serializes a tool payload to minified JSON following SCHEMAS[schema].
+    Missing fields are emitted as null so the shape never changes between calls.
+    `fields` restricts output to a subset, `precision` controls float rounding and
+    `budget` overrides the per-agent token cap from TOKEN_BUDGETS.
+    """
+    keys = [k for k in SCHEMAS[schema] if fields is None or k in fields]
+    record = {k: _round(payload.get(k), precision) for k in keys}
+    budget = TOKEN_BUDGETS.get(schema) if budget is None else budget
+
+    text = _dumps(record)
+    while budget is not None and estimate_tokens(text) > budget:
+        # Shorten lists (e.g. headlines) before dropping whole fields
+        lists = [k for k, v in record.items() if isinstance(v, list) and v]
+        if lists:
+            record[lists[-1]].pop()
+        elif len(record) > 1:
+            record.popitem()
+        else:
+            break
+        text = _dumps(record)
+    return text
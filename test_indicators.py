@@ -0,0 +1,74 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip("ta")
+
+from analytics import compute_technicals, compute_technicals_batch
+from bench_indicators import synthetic_prices, ta_indicators
+from indicators import compute_indicators
+
+TOLERANCE = dict(rtol=1e-9, atol=1e-9, equal_nan=True)
+
+
+@pytest.fixture(scope="module")
+def prices():
+    return synthetic_prices(6, 252)
+
+
+def assert_matches_ta(result: dict, close, high, low, volume):
+    expected = ta_indicators(close, high, low, volume)
+    for name, values in result.items():
+        np.testing.assert_allclose(values, np.asarray(expected[name], dtype=float), err_msg=name, **TOLERANCE)
+
+
+def test_batch_matches_ta_per_column(prices):
+    close, high, low, volume = prices
+    result = compute_indicators(close, high, low, volume)
+
+    for j in range(close.shape[1]):
+        assert_matches_ta({k: v[:, j] for k, v in result.items()}, close[:, j], high[:, j], low[:, j], volume[:, j])
+
+
+def test_single_series_matches_ta_and_keeps_shape(prices):
+    close, high, low, volume = (a[:, 0] for a in prices)
+    result = compute_indicators(close, high, low, volume)
+
+    assert all(v.shape == close.shape for v in result.values())
+    assert_matches_ta(result, close, high, low, volume)
+
+
+@pytest.mark.parametrize("start", [1, 30, 200])
+def test_leading_nan_column_matches_ta_on_its_own_history(prices, start):
+    """A ticker listed later is padded with NaN; its values match `ta` on the shorter series."""
+    close, high, low, volume = (a.copy() for a in prices)
+    for a in (close, high, low, volume):
+        a[:start, 1] = np.nan
+    result = compute_indicators(close, high, low, volume)
+
+    for name, values in result.items():
+        assert np.isnan(values[:start, 1]).all(), name
+    assert_matches_ta({k: v[start:, 1] for k, v in result.items()},
+                      close[start:, 1], high[start:, 1], low[start:, 1], volume[start:, 1])
+    # Neighbouring columns are unaffected
+    assert_matches_ta({k: v[:, 0] for k, v in result.items()}, close[:, 0], high[:, 0], low[:, 0], volume[:, 0])
+
+
+def test_close_only_skips_atr_and_obv(prices):
+    result = compute_indicators(prices[0])
+
+    assert "atr" not in result and "obv" not in result
+    np.testing.assert_allclose(result["rsi"], compute_indicators(*prices)["rsi"], **TOLERANCE)
+
+
+def test_batched_technicals_match_single_series(prices):
+    close = prices[0]
+    # Different history lengths, as in a shard mixing new and old listings
+    closes = {f"T{j}": pd.Series(close[j * 20:, j]) for j in range(close.shape[1])}
+    batch = compute_technicals_batch(closes)
+
+    for t, series in closes.items():
+        single = compute_technicals(series.to_frame("Close"), t)
+        assert batch[t].keys() == single.keys()
+        for key in ("price", "rsi", "macd", "macd_sig", "sma50"):
+            np.testing.assert_allclose(batch[t][key], single[key], err_msg=f"{t} {key}", **TOLERANCE)
@@ -0,0 +1,55 @@
+import numpy as np
+import pytest
+
+from indicators import compute_indicators
+from live import QuoteFeed, LiveWatch, ReplayFeed, SMA_WINDOW
+
+TICKERS = ["AAA", "BBB"]
+BARS = 80
+
+
+def replayed_watch(polls=None):
+    watch = LiveWatch(ReplayFeed.simulated(TICKERS, bars=BARS, seed=7), TICKERS)
+    if polls is None:
+        while not watch.feed.exhausted:
+            watch.step()
+    else:
+        for _ in range(polls):
+            watch.step()
+    return watch
+
+
+def test_quote_feed_requires_poll():
+    with pytest.raises(TypeError):
+        QuoteFeed()
+
+
+def test_metrics_match_batch_kernel():
+    watch = replayed_watch()
+
+    for ticker in TICKERS:
+        close = watch.candles(ticker)["Close"].to_numpy()
+        assert len(close) == BARS
+        expected = compute_indicators(close, sma_windows=(SMA_WINDOW,), ema_windows=())
+        metrics = watch.tickers[ticker].metrics()
+        for key, name in (("rsi", "rsi"), ("macd", "macd"), ("macd_sig", "macd_signal"), ("sma", f"sma_{SMA_WINDOW}")):
+            np.testing.assert_allclose(metrics[key], expected[name][-1], rtol=1e-9, err_msg=f"{ticker} {key}")
+
+
+def test_updates_return_only_changed_keys():
+    watch = replayed_watch(polls=40)
+    cursor, _ = watch.updates()
+    before = watch.snapshot()
+
+    watch.step()
+    version, changes = watch.updates(cursor)
+    after = watch.snapshot()
+
+    assert version == cursor + 1
+    for ticker in TICKERS:
+        changed = {k for k in after.columns if before.at[ticker, k] != after.at[ticker, k]}
+        assert set(changes[ticker]["metrics"]) == changed
+        assert changes[ticker]["metrics"] == {k: after.at[ticker, k] for k in changed}
+        # Only the candle formed by this poll is sent
+        assert changes[ticker]["candles"] == watch.candle_rows(ticker)[-1:]
+    assert watch.updates(version) == (version, {})
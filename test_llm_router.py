@@ -0,0 +1,128 @@
+import time
+
+import pytest
+
+pytest.importorskip("crewai")
+
+from deadline import Deadline, DeadlineExceeded, deadline_scope
+from llm_router import ROUTER_LOG_SIZE, ModelRouter, ModelStats, RoutedLLM, StubLLM
+
+MESSAGES = [{"role": "user", "content": "ping"}]
+
+
+def routed(primary, fallback, deadline=0.2, stats=None, log=None):
+    return RoutedLLM("Technical Analyst", primary, fallback, deadline, stats or ModelStats(), [] if log is None else log)
+
+
+def test_primary_answers_within_deadline():
+    primary, fallback = StubLLM("stub/primary", reply="primary"), StubLLM("stub/fallback", reply="fallback")
+    llm = routed(primary, fallback)
+
+    assert llm.call(MESSAGES) == "primary"
+    assert fallback.calls == 0
+    assert llm.log == [{"role": "Technical Analyst", "model": "stub/primary", "latency_s": 0.0, "hedged": False}]
+
+
+def test_fails_over_on_error():
+    primary, fallback = StubLLM("stub/primary", fail=True), StubLLM("stub/fallback", reply="fallback")
+    llm = routed(primary, fallback)
+
+    assert llm.call(MESSAGES) == "fallback"
+    assert primary.calls == 1
+    assert [(e["model"], e["hedged"]) for e in llm.log] == [("stub/fallback", True)]
+
+
+def test_error_without_fallback_is_raised():
+    llm = routed(StubLLM("stub/primary", fail=True), None)
+
+    with pytest.raises(RuntimeError):
+        llm.call(MESSAGES)
+    assert llm.log == []
+
+
+def test_hedges_when_primary_misses_deadline():
+    primary = StubLLM("stub/primary", reply="primary", latency=1.0)
+    fallback = StubLLM("stub/fallback", reply="fallback", latency=0.05)
+    llm = routed(primary, fallback, deadline=0.1)
+
+    started = time.monotonic()
+    assert llm.call(MESSAGES) == "fallback"
+    assert time.monotonic() - started < 0.5
+    assert [(e["model"], e["hedged"]) for e in llm.log] == [("stub/fallback", True)]
+
+
+def test_slow_primary_still_wins_the_race():
+    primary = StubLLM("stub/primary", reply="primary", latency=0.15)
+    fallback = StubLLM("stub/fallback", reply="fallback", latency=1.0)
+    llm = routed(primary, fallback, deadline=0.1)
+
+    assert llm.call(MESSAGES) == "primary"
+    assert [(e["model"], e["hedged"]) for e in llm.log] == [("stub/primary", True)]
+
+
+def test_run_deadline_caps_the_hedge():
+    llm = routed(StubLLM("stub/primary", latency=1.0), StubLLM("stub/fallback", latency=1.0), deadline=0.05)
+
+    with deadline_scope(Deadline(0.2)), pytest.raises(DeadlineExceeded):
+        llm.call(MESSAGES)
+    assert llm.log == []
+
+
+def test_expired_run_deadline_skips_the_call():
+    primary = StubLLM("stub/primary")
+    llm = routed(primary, StubLLM("stub/fallback"))
+
+    with deadline_scope(Deadline(0)), pytest.raises(DeadlineExceeded):
+        llm.call(MESSAGES)
+    assert primary.calls == 0
+
+
+def test_unhealthy_primary_is_skipped_then_probed_after_cooldown():
+    stats = ModelStats(cooldown=0.2)
+    primary, fallback = StubLLM("stub/primary", fail=True), StubLLM("stub/fallback", reply="fallback")
+    llm = routed(primary, fallback, stats=stats)
+
+    for _ in range(3):
+        llm.call(MESSAGES)
+    assert not stats.healthy("stub/primary", llm.deadline)
+    calls_when_unhealthy = primary.calls
+    llm.call(MESSAGES)
+    assert primary.calls == calls_when_unhealthy  # routed straight to the fallback
+
+    primary.fail = False
+    time.sleep(0.25)
+    assert llm.call(MESSAGES) == "Final Answer: stub"
+    assert llm.log[-1] == {"role": "Technical Analyst", "model": "stub/primary", "latency_s": 0.0, "hedged": False}
+
+
+def test_router_logs_every_call_per_role():
+    router = ModelRouter("key", llm_factory=lambda model, route, api_key: StubLLM(model))
+    router.llm_for("Technical Analyst").call(MESSAGES)
+    router.llm_for("Portfolio Manager").call(MESSAGES)
+
+    assert [(e["role"], e["model"]) for e in router.log] == [
+        ("Technical Analyst", "gemini/gemini-2.5-flash-lite"),
+        ("Portfolio Manager", "gemini/gemini-2.5-flash"),
+    ]
+    assert set(router.stats.snapshot()) == {"gemini/gemini-2.5-flash-lite", "gemini/gemini-2.5-flash"}
+
+
+def test_run_log_only_holds_its_own_calls():
+    router = ModelRouter("key", llm_factory=lambda model, route, api_key: StubLLM(model))
+    run_a, run_b = [], []
+    router.llm_for("Technical Analyst", run_a).call(MESSAGES)
+    router.llm_for("Portfolio Manager", run_b).call(MESSAGES)
+    router.llm_for("Technical Analyst", run_a).call(MESSAGES)
+
+    assert [e["role"] for e in run_a] == ["Technical Analyst", "Technical Analyst"]
+    assert [e["role"] for e in run_b] == ["Portfolio Manager"]
+    assert len(router.log) == 3
+
+
+def test_shared_log_is_bounded():
+    router = ModelRouter("key", llm_factory=lambda model, route, api_key: StubLLM(model))
+    llm = router.llm_for("Technical Analyst")
+    for _ in range(ROUTER_LOG_SIZE + 5):
+        llm.call(MESSAGES)
+
+    assert len(router.log) == ROUTER_LOG_SIZE
@@ -139,10 +139,15 @@
 import yfinance as yf
 from crewai.tools import tool
 import pandas as pd
-import ta
-import numpy as np
-import requests
 from langchain_community.tools import DuckDuckGoSearchRun
+from serializer import compact
+from sentiment import local_news_sentiment
+from news_store import NewsStore
+from movers import MoversRecorder
+from deadline import bounded_call, check_deadline, request_timeout
+from analytics import compute_technicals, compute_risk, fundamentals_from_info
+from analytics_store import AnalyticsStore
+from intraday import IntradayStore, session_snapshot
 
 class StockAnalysisTools:
     
@@ -153,60 +158,52 @@ class StockAnalysisTools:
         """
         Fetches the current Top Gainers, Losers, and Most Active stocks from the market.
         Useful for identifying trending stocks to analyze.
+        Returns compact JSON: movers as [ticker, change %] pairs.
         """
-        url = f"https://www.alphavantage.co/query?function=TOP_GAINERS_LOSERS&apikey={api_key}"
         try:
-            response = requests.get(url)
-            data = response.json()
+            # Served from the shared snapshot table; the API is hit at most once per poll interval
+            recorder = MoversRecorder()
+            recorder.poll_if_due(api_key)
+            gainers = recorder.latest("gainers", 3)  # Top 3 to save context window
             
-            # Error Handling for Rate Limits
-            if "Information" in data or "Note" in data:
+            if not gainers:
                 return "Error: Alpha Vantage Rate Limit Reached. Use fallback list."
-            
-            if "top_gainers" in data:
-                # Get top 3 gainers to save context window
-                gainers = data["top_gainers"][:3]
-                result = [f"{g['ticker']} (+{g['change_percentage']})" for g in gainers]
-                return ", ".join(result)
-            return "No data found."
+            movers = [[g['ticker'], float(g['change_percentage'].rstrip('%'))] for g in gainers]
+            return compact("movers", {"movers": movers})
         except Exception as e:
             return f"API Error: {e}"
 
     @tool("Fetch News Sentiment")
-    def fetch_news_sentiment(ticker: str, api_key: str):
+    def fetch_news_sentiment(ticker: str, api_key: str, start_date: str = None, end_date: str = None):
         """
         Fetches comprehensive news sentiment and buzz scores for a stock using Alpha Vantage.
-        Returns a summary of the market sentiment (Bullish/Bearish) and key news headlines.
+        Optionally pass start_date and end_date (YYYY-MM-DD) to score a specific window.
+        Returns compact JSON: mood (Bullish/Bearish/Neutral), score, article count n
+        and headlines as [title, sentiment label] pairs.
         """
-        url = f"https://www.alphavantage.co/query?function=NEWS_SENTIMENT&tickers={ticker}&sort=LATEST&limit=5&apikey={api_key}"
         try:
-            response = requests.get(url)
-            data = response.json()
-            
-            if "Information" in data or "Note" in data:
-                return "Sentiment Data Unavailable (Rate Limit). Assume Neutral sentiment."
-            
-            if "feed" in data:
-                articles = data["feed"]
-                
-                # Calculate aggregate sentiment score
-                sentiment_scores = [float(a.get('overall_sentiment_score', 0)) for a in articles]
-                avg_score = sum(sentiment_scores) / len(sentiment_scores) if sentiment_scores else 0
-                
-                # Interpret Score
-                if avg_score >= 0.35: sentiment_label = "Bullish"
-                elif avg_score <= -0.35: sentiment_label = "Bearish"
-                else: sentiment_label = "Neutral"
-                
-                headlines = [f"- {a['title']} (Sentiment: {a['overall_sentiment_label']})" for a in articles[:3]]
-                
-                return f"""
-                Sentiment Analysis for {ticker}:
-                - Market Mood: {sentiment_label} (Score: {avg_score:.2f})
-                - Recent Headlines:
-                {chr(10).join(headlines)}
-                """
-            return "No news found."
+            # Only articles newer than the stored ones are downloaded; the window is answered locally
+            store = NewsStore()
+            added = store.sync(ticker, api_key, since=start_date)
+            summary = store.window_sentiment(ticker, start_date, end_date)
+
+            if summary["n"] == 0:
+                if added is None:
+                    # Rate limited: score Yahoo headlines locally instead of assuming Neutral
+                    return compact("sentiment", local_news_sentiment(ticker))
+                return "No news found."
+            return compact("sentiment", summary)
+        except Exception as e:
+            return f"Sentiment Tool Error: {e}"
+
+    @tool("Fetch Local News Sentiment")
+    def fetch_local_news_sentiment(ticker: str):
+        """
+        Scores recent Yahoo Finance headlines for a stock with an offline finance lexicon.
+        Uses no Alpha Vantage quota. Same output as 'Fetch News Sentiment'.
+        """
+        try:
+            return compact("sentiment", local_news_sentiment(ticker))
         except Exception as e:
             return f"Sentiment Tool Error: {e}"
 
@@ -216,19 +213,16 @@ class StockAnalysisTools:
     def fetch_fundamental_data(ticker: str):
         """
         Fetches fundamental data: P/E, Market Cap, EPS, and Sector.
+        Returns compact JSON: price, mcap, pe, sector, beta, price_asof (when the price was quoted).
         """
         try:
-            stock = yf.Ticker(ticker)
-            info = stock.info
-            simple_info = {
-                "Ticker": ticker,
-                "Price": info.get("currentPrice"),
-                "MarketCap": info.get("marketCap"),
-                "PE_Ratio": info.get("trailingPE"),
-                "Sector": info.get("sector"),
-                "Beta": info.get("beta")
-            }
-            return str(simple_info)
+            # Nightly pipeline rows first; compute on the fly only on a miss
+            cached = AnalyticsStore().load(ticker, "fundamentals")
+            if cached: return compact("fundamentals", cached)
+
+            check_deadline()
+            info = bounded_call(lambda: yf.Ticker(ticker).info)
+            return compact("fundamentals", fundamentals_from_info(info, ticker))
         except Exception as e:
             return f"Error fetching fundamentals: {e}"
 
@@ -236,48 +230,51 @@ class StockAnalysisTools:
     def calculate_technicals(ticker: str):
         """
         Calculates RSI, MACD, and SMAs for a stock.
+        Returns compact JSON: price, rsi, macd, macd_sig, sma50.
         """
         try:
+            cached = AnalyticsStore().load(ticker, "technicals")
+            if cached: return compact("technicals", cached)
+
             stock = yf.Ticker(ticker)
-            df = stock.history(period="6mo")
+            df = stock.history(period="6mo", timeout=request_timeout())
             if df.empty: return "No data."
 
-            # RSI
-            df['rsi'] = ta.momentum.RSIIndicator(df['Close']).rsi()
-            # MACD
-            macd = ta.trend.MACD(df['Close'])
-            df['macd'] = macd.macd()
-            df['macd_signal'] = macd.macd_signal()
-            # SMA
-            df['sma_50'] = ta.trend.SMAIndicator(df['Close'], window=50).sma_indicator()
-            
-            latest = df.iloc[-1]
-            return f"""
-            Technicals for {ticker}:
-            - Price: {latest['Close']:.2f}
-            - RSI: {latest['rsi']:.2f} (Over 70=Overbought, Under 30=Oversold)
-            - MACD: {latest['macd']:.2f} (Signal: {latest['macd_signal']:.2f})
-            - SMA 50: {latest['sma_50']:.2f}
-            """
+            return compact("technicals", compute_technicals(df, ticker))
         except Exception as e:
             return f"Error with technicals: {e}"
 
+    @tool("Fetch Intraday Price Action")
+    def fetch_intraday_price_action(ticker: str, bar_size: str = "15m"):
+        """
+        Summarizes today's regular-session price action from intraday bars.
+        bar_size can be any multiple of 1 minute, e.g. "5m", "15m", "30m", "1h".
+        Returns compact JSON: last, chg_open_pct, vwap_dist_pct, range_pos (0 = day low,
+        1 = day high), rsi on the chosen bars, bars_today.
+        """
+        try:
+            check_deadline()
+            df = IntradayStore().bars(ticker, bar_size, days=5, timeout=request_timeout())
+            if df.empty: return "No intraday data."
+
+            return compact("intraday", session_snapshot(df, ticker, bar_size))
+        except Exception as e:
+            return f"Intraday Error: {e}"
+
     @tool("Calculate Risk Metrics")
     def calculate_risk_metrics(ticker: str):
         """
         Calculates detailed risk metrics: Beta, Volatility, and Max Drawdown.
+        Returns compact JSON: vol_pct (annualized volatility %), mdd_pct (1Y max drawdown %).
         """
         try:
+            cached = AnalyticsStore().load(ticker, "risk")
+            if cached: return compact("risk", cached)
+
             stock = yf.Ticker(ticker)
-            hist = stock.history(period="1y")
+            hist = stock.history(period="1y", timeout=request_timeout())
             if hist.empty: return "No data."
             
-            hist['pct_change'] = hist['Close'].pct_change()
-            volatility = hist['pct_change'].std() * np.sqrt(252) * 100
-            rolling_max = hist['Close'].cummax()
-            daily_drawdown = hist['Close'] / rolling_max - 1.0
-            max_drawdown = daily_drawdown.min() * 100
-            
-            return f"Risk: Volatility {volatility:.2f}%, Max Drawdown {max_drawdown:.2f}%"
+            return compact("risk", compute_risk(hist, ticker))
         except Exception as e:
             return f"Risk Calc Error: {e}"
\ No newline at end of file
@@ -0,0 +1,24 @@
+import os
+
+# Liquid large caps used when no universe file is configured
+DEFAULT_UNIVERSE = [
+    "AAPL", "MSFT", "NVDA", "AMZN", "GOOGL", "META", "TSLA", "AVGO", "AMD", "NFLX",
+    "ORCL", "CRM", "ADBE", "INTC", "QCOM", "MU", "TXN", "AMAT", "LRCX", "KLAC",
+    "JPM", "BAC", "WFC", "GS", "MS", "C", "V", "MA", "PYPL", "AXP",
+    "UNH", "JNJ", "LLY", "PFE", "MRK", "ABBV", "TMO", "ABT", "AMGN", "GILD",
+    "XOM", "CVX", "COP", "SLB", "OXY", "WMT", "COST", "HD", "LOW", "TGT",
+    "KO", "PEP", "MCD", "SBUX", "NKE", "DIS", "BA", "CAT", "GE", "UBER",
+]
+
+UNIVERSE_FILE = os.getenv("UNIVERSE_FILE", os.path.join("data", "universe.txt"))
+
+
+def load_universe(path: str = UNIVERSE_FILE) -> list:
+    """Tickers from a one-per-line file (blank lines and # comments ignored), else the default list."""
+    if path and os.path.exists(path):
+        with open(path) as f:
+            tickers = [line.split("#")[0].strip().upper() for line in f]
+        tickers = [t for t in tickers if t]
+        if tickers:
+            return tickers
+    return list(DEFAULT_UNIVERSE)